@@ -1,7 +1,14 @@
+import importlib
+import math
+import os
+import sys
+import time
+_script_start = time.perf_counter()
+
 import streamlit as st
 from streamlit_option_menu import option_menu
-import joblib
-import numpy as np
+# numpy, pandas and the model code are imported lazily (see deferred_import), so the
+# Home page never pays for them.
 
 # --- 1. ADVANCED UI/UX STYLING WITH CSS & JS ---
 
@@ -27,7 +34,7 @@ h1, h2, h3 {
 }
 
 /* --- Buttons --- */
-.stButton>button {
+.stButton>button, .stFormSubmitButton>button {
     color: #ffffff;
     background-color: #1a73e8;
     border: none;
@@ -38,7 +45,7 @@ h1, h2, h3 {
     transition: all 0.3s ease-in-out;
     box-shadow: 0 4px 6px rgba(0,0,0,0.1);
 }
-.stButton>button:hover {
+.stButton>button:hover, .stFormSubmitButton>button:hover {
     background-color: #155ab6;
     transform: translateY(-2px);
     box-shadow: 0 6px 8px rgba(0,0,0,0.15);
@@ -157,18 +164,252 @@ window.onclick = function(event) {
 
 # --- MODEL LOADING ---
 @st.cache_resource
-def load_model_and_scaler(model_path, scaler_path):
+def startup_timings():
+    """
+    Process-wide startup report, filled in by the first script run, by each first import of a
+    deferred module and by each first model load.
+    """
+    return {'first_render_ms': None, 'first_run_ms': None, 'imports_ms': {}, 'model_load_ms': {}}
+
+
+def process_uptime():
+    """
+    Seconds since this server process started, or None where the start time can't be read.
+
+    Taken from the kernel's process start time, so it covers interpreter startup and
+    `streamlit run` bringing up its server, not just this script.
+    """
+    try:
+        with open('/proc/self/stat') as f:
+            # Field 22 is the start time in clock ticks after boot; the fields after the
+            # parenthesised command name start at field 3
+            start_ticks = int(f.read().rpartition(')')[2].split()[19])
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        return uptime - start_ticks / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return time.time() - psutil.Process().create_time()
+
+
+def deferred_import(module_name):
+    """
+    Imports a module app.py loads lazily, recording how long its first import in this process took.
+    """
+    module = sys.modules.get(module_name)
+    if module is None:
+        start = time.perf_counter()
+        module = importlib.import_module(module_name)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        startup_timings()['imports_ms'][module_name] = elapsed_ms
+        print(f"[startup] first import of {module_name}: {elapsed_ms:.1f} ms")
+    return module
+
+
+@st.cache_resource
+def model_registry():
+    """
+    One model registry per server process. It watches models/ and hot-swaps retrained
+    models in the background, so no restart is needed after train.py runs.
+    """
+    from model_registry import ModelRegistry
+    return ModelRegistry().start()
+
+
+def load_model(disease):
+    """
+    Returns the active model for a disease, loading it on first use; called only from that disease's page.
+    """
+    # Imported one by one in dependency order, so each time is that module's own cost
+    for module_name in ('numpy', 'linear_scorer', 'artifact', 'diseases', 'model_registry'):
+        deferred_import(module_name)
     try:
-        model = joblib.load(model_path)
-        scaler = joblib.load(scaler_path)
-        return model, scaler
+        # Memory-mapped .hpm artifact when present, joblib pickles otherwise; either way
+        # the scaler + linear SVC + Platt sigmoid come back folded into one LinearScorer
+        entry = model_registry().entry(disease)
     except FileNotFoundError:
         # Fail silently or show a warning, but don't crash the UI demo
-        return None, None
+        return None
+    except ValueError as e:
+        # A damaged .hpm (ArtifactError) or a model trained on other features; the page
+        # shows its "Model not loaded" warning
+        print(f"[startup] could not load the {disease} model: {e}")
+        return None
+    timings = startup_timings()['model_load_ms']
+    if disease not in timings:
+        timings[disease] = entry.load_seconds * 1000
+        print(f"[startup] {disease} model loaded in {timings[disease]:.1f} ms")
+    return entry.scorer
+
+
+@st.cache_resource
+def prediction_cache():
+    """
+    One prediction cache shared by every session in this server process.
+    """
+    from prediction_cache import PredictionCache
+    return PredictionCache()
+
+
+@st.cache_resource
+def prediction_metrics():
+    """
+    Per-stage prediction timings and counters for this server process, exported in
+    Prometheus format when HEALTH_METRICS_PORT (GET /metrics) or HEALTH_METRICS_FILE is set.
+    HEALTH_METRICS_SLOW_MS logs predictions slower than that many milliseconds and
+    samples their stacks into slow_predictions.folded.
+    """
+    import metrics
+
+    slow_ms = os.environ.get('HEALTH_METRICS_SLOW_MS')
+    slow_threshold = float(slow_ms) / 1000 if slow_ms else None
+    registry = metrics.Metrics(slow_threshold=slow_threshold)
+    profiler = metrics.SlowRequestProfiler(registry, threshold=slow_threshold) if slow_ms else None
+
+    def log_slow(disease, seconds, stages):
+        breakdown = ', '.join(f"{stage} {elapsed * 1000:.2f} ms" for stage, elapsed in stages)
+        print(f"[metrics] slow {disease} prediction: {seconds * 1000:.2f} ms ({breakdown})")
+        if profiler is not None:
+            profiler.dump('slow_predictions.folded')
+
+    registry.on_slow = log_slow
+    if os.environ.get('HEALTH_METRICS_PORT'):
+        metrics.start_http_server(registry, int(os.environ['HEALTH_METRICS_PORT']))
+    if os.environ.get('HEALTH_METRICS_FILE'):
+        metrics.start_textfile_writer(registry, os.environ['HEALTH_METRICS_FILE'])
+    return registry
+
+
+@st.cache_resource
+def drift_monitors():
+    """
+    Input-drift monitors per disease for this server process, shared by every session.
+    """
+    return {}
+
+
+def observe_drift(disease, scorer, row):
+    """
+    Feeds one submitted row to the disease's drift monitor; a retrained model starts a fresh one.
+    """
+    from diseases import DISEASES
+    from drift_monitor import DriftMonitor
+
+    monitors = drift_monitors()
+    monitor = monitors.get(disease)
+    if monitor is None or monitor.version != scorer.version:
+        monitor = monitors[disease] = DriftMonitor.from_scorer(
+            scorer, DISEASES[disease]['feature_columns'],
+            on_drift=lambda features: print(f"[drift] {disease} inputs drifted from training on: {', '.join(features)}"),
+        )
+    monitor.observe(row)
+
+
+def show_prediction(disease, scorer, values, condition):
+    """
+    Parses the form values in training-column order, scores them and renders the result.
+    """
+    timer = prediction_metrics().start(disease)
+    try:
+        _predict_and_render(disease, scorer, values, condition, timer)
+    except BaseException:
+        # Close the timer whatever failed, so the slow-request profiler stops sampling
+        # this session's thread and the prediction is counted as an error
+        timer.finish(error=True)
+        raise
+
+
+def _predict_and_render(disease, scorer, values, condition, timer):
+    np = deferred_import('numpy')
+
+    try:
+        row = np.array([float(value) for value in values], dtype=np.float64).reshape(1, -1)
+        # float() takes 'nan' and 'inf' as numbers; the scorer can't
+        if not np.isfinite(row).all():
+            raise ValueError('non-finite feature value')
+    except (TypeError, ValueError):
+        st.error("Please fill in every field with a numeric value.")
+        timer.mark('parse')
+        timer.finish(error=True)
+        return
+    timer.mark('parse')
+    observe_drift(disease, scorer, row[0])
+    timer.mark('drift')
+
+    cache = prediction_cache()
+    probability = cache.get(disease, scorer.version, row)
+    cache_hit = probability is not None
+    timer.mark('cache')
+    if not cache_hit:
+        # Scaling is folded into the weights, so this one dot product covers both
+        decision = scorer.decision_function(row)
+        timer.mark('scale_decision')
+        probability = float(scorer.proba_from_decision(decision)[0, 1])
+        timer.mark('probability')
+    if not math.isfinite(probability):
+        # Finite but huge inputs (e.g. 1e308) can still overflow the decision value
+        st.error("These values are outside the range the model can score; please check every field.")
+        timer.finish(error=True)
+        return
+    if not cache_hit:
+        cache.put(disease, scorer.version, row, probability)
+
+    if probability >= 0.5:
+        st.error(f"High risk of {condition} (estimated probability {probability:.1%}).")
+    else:
+        st.success(f"Low risk of {condition} (estimated probability {probability:.1%}).")
+    st.caption(f"Model version {scorer.version[:12]}")
+    timer.mark('render')
+
+    show_explanation(disease, scorer, row)
+    timer.mark('explain')
+    timer.finish(cache_hit=cache_hit)
+
 
-diabetes_model, diabetes_scaler = load_model_and_scaler('models/diabetes_model.pkl', 'models/diabetes_scaler.pkl')
-heart_model, heart_scaler = load_model_and_scaler('models/heart_model.pkl', 'models/heart_scaler.pkl')
-parkinsons_model, parkinsons_scaler = load_model_and_scaler('models/parkinsons_model.pkl', 'models/parkinsons_scaler.pkl')
+def show_explanation(disease, scorer, row, top=8):
+    """
+    Waterfall of the features that moved this prediction, from the model's baseline to its decision value.
+    """
+    pd = deferred_import('pandas')
+    alt = deferred_import('altair')
+    from diseases import DISEASES
+
+    explanation = scorer.explain(row, top=top, feature_names=DISEASES[disease]['feature_columns'])
+    steps = [(c.feature, c.value, c.contribution) for c in explanation.contributions]
+    hidden = scorer.n_features - len(steps)
+    if hidden:
+        steps.append((f"{hidden} other features", None, explanation.rest))
+
+    records = [{'step': 'Baseline', 'input': None, 'start': 0.0, 'end': explanation.base_value,
+                'change': explanation.base_value, 'kind': 'Baseline / result'}]
+    running = explanation.base_value
+    for feature, value, contribution in steps:
+        records.append({'step': feature, 'input': value, 'start': running, 'end': running + contribution,
+                        'change': contribution, 'kind': 'Raises risk' if contribution > 0 else 'Lowers risk'})
+        running += contribution
+    records.append({'step': 'Decision value', 'input': None, 'start': 0.0, 'end': explanation.decision,
+                    'change': explanation.decision, 'kind': 'Baseline / result'})
+
+    chart = alt.Chart(pd.DataFrame(records)).mark_bar().encode(
+        y=alt.Y('step:N', sort=None, title=None),
+        x=alt.X('start:Q', title='Decision value (above 0 favours the condition)'),
+        x2='end:Q',
+        color=alt.Color('kind:N', title=None, legend=alt.Legend(orient='bottom'),
+                        scale=alt.Scale(domain=['Baseline / result', 'Raises risk', 'Lowers risk'],
+                                        range=['#1a73e8', '#d93025', '#188038'])),
+        tooltip=['step', alt.Tooltip('input:Q', title='Your value'), alt.Tooltip('change:Q', format='+.3f')],
+    )
+    with st.expander("What drove this prediction", expanded=True):
+        st.altair_chart(chart)
+        st.caption(
+            "Exact contributions of the linear model: the baseline is the decision value for an average "
+            "patient from the training data, and each bar adds how far your value sits from that average "
+            "times the feature's weight."
+        )
 
 
 # --- SIDEBAR NAVIGATION ---
@@ -264,90 +505,143 @@ if selected == 'Home':
 
 # --- PREDICTION PAGES with Detailed Help ---
 
+# Each prediction page is a form inside a fragment: typing into a field doesn't rerun
+# anything, and submitting reruns only the fragment (inputs and result pane), not the
+# CSS, sidebar and the rest of the script.
+@st.fragment
+def diabetes_form():
+    diabetes_scorer = load_model('diabetes')
+    with st.form('diabetes_form', border=False):
+        col1, col2 = st.columns(2)
+        with col1:
+            Pregnancies = st.text_input('Number of Pregnancies', help="Enter the total number of times you have been pregnant. *Standard Value:* Typically 0 or more.")
+            Glucose = st.text_input('Glucose', help="Your plasma glucose level from a glucose tolerance test. *Normal Range:* < 140 mg/dL. *To Measure:* This requires a blood test ordered by a doctor.")
+            SkinThickness = st.text_input('Skin Thickness', help="Triceps skin fold thickness. *Normal Range:* Varies widely, but an average is ~20-30mm. *To Measure:* Requires special calipers; not a home measurement.")
+            DiabetesPedigreeFunction = st.text_input('Diabetes Pedigree Function', help="A score assessing diabetes likelihood based on family history. *Standard Value:* This is a calculated score; an average value might be around 0.4-0.5. Higher values indicate a stronger genetic link.")
+        with col2:
+            Age = st.text_input('Age', help="Your current age in years. *Standard Value:* N/A.")
+            BloodPressure = st.text_input('Blood Pressure', help="Diastolic Blood Pressure (the bottom number). *Normal Range:* 60-80 mm Hg. *To Measure:* Use a home blood pressure monitor.")
+            Insulin = st.text_input('Insulin', help="2-Hour serum insulin level. *Normal Range:* < 25 mU/L. *To Measure:* This requires a blood test ordered by a doctor.")
+            BMI = st.text_input('Body Mass Index (BMI)', help="Your body mass index. *Normal Range:* 18.5 - 24.9. *To Calculate:* Weight (kg) / [Height (m)]^2. You can calculate this at home with a scale and measuring tape.")
+
+        submitted = st.form_submit_button('Predict Diabetes Risk', use_container_width=True)
+
+    if submitted:
+        if diabetes_scorer:
+            show_prediction('diabetes', diabetes_scorer, [Pregnancies, Glucose, BloodPressure, SkinThickness, Insulin, BMI, DiabetesPedigreeFunction, Age], "diabetes")
+        else:
+            st.warning("Model not loaded. Please check your model files.")
+
+
 if selected == 'Diabetes Prediction':
     st.title("Diabetes Prediction")
     st.markdown("Enter the values below. Hover over the *(?)* for detailed information on each parameter.")
-    
-    col1, col2 = st.columns(2)
-    with col1:
-        Pregnancies = st.text_input('Number of Pregnancies', help="Enter the total number of times you have been pregnant. *Standard Value:* Typically 0 or more.")
-        Glucose = st.text_input('Glucose', help="Your plasma glucose level from a glucose tolerance test. *Normal Range:* < 140 mg/dL. *To Measure:* This requires a blood test ordered by a doctor.")
-        SkinThickness = st.text_input('Skin Thickness', help="Triceps skin fold thickness. *Normal Range:* Varies widely, but an average is ~20-30mm. *To Measure:* Requires special calipers; not a home measurement.")
-        DiabetesPedigreeFunction = st.text_input('Diabetes Pedigree Function', help="A score assessing diabetes likelihood based on family history. *Standard Value:* This is a calculated score; an average value might be around 0.4-0.5. Higher values indicate a stronger genetic link.")
-    with col2:
-        Age = st.text_input('Age', help="Your current age in years. *Standard Value:* N/A.")
-        BloodPressure = st.text_input('Blood Pressure', help="Diastolic Blood Pressure (the bottom number). *Normal Range:* 60-80 mm Hg. *To Measure:* Use a home blood pressure monitor.")
-        Insulin = st.text_input('Insulin', help="2-Hour serum insulin level. *Normal Range:* < 25 mU/L. *To Measure:* This requires a blood test ordered by a doctor.")
-        BMI = st.text_input('Body Mass Index (BMI)', help="Your body mass index. *Normal Range:* 18.5 - 24.9. *To Calculate:* Weight (kg) / [Height (m)]^2. You can calculate this at home with a scale and measuring tape.")
-    
-    if st.button('Predict Diabetes Risk', use_container_width=True):
-        if diabetes_model and diabetes_scaler:
-            # Placeholder for prediction logic
-            pass 
+    diabetes_form()
+
+
+@st.fragment
+def heart_form():
+    heart_scorer = load_model('heart')
+    with st.form('heart_form', border=False):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            age = st.text_input('Age', help="Your age in years.")
+            trestbps = st.text_input('Resting Blood Pressure', help="Systolic blood pressure (top number) in mm Hg. *Normal Range:* 90-120 mm Hg. *To Measure:* Use a home blood pressure monitor.")
+            restecg = st.selectbox('Resting ECG', [0,1,2], format_func=lambda x: {0:"Normal", 1:"ST-T Abnormality", 2:"Hypertrophy"}[x], help="Results of a resting electrocardiogram. *Standard Value:* 0 (Normal). *To Measure:* Requires an ECG test at a clinic.")
+            oldpeak = st.text_input('ST Depression', help="ST depression induced by exercise. *Normal Value:* 0. *To Measure:* Measured during a stress test by a medical professional.")
+        with col2:
+            sex = st.selectbox('Sex', [0,1], format_func=lambda x: "Female" if x==0 else "Male", help="Your biological sex.")
+            chol = st.text_input('Serum Cholesterol', help="Total cholesterol level. *Normal Range:* < 200 mg/dL. *To Measure:* Requires a blood test.")
+            thalach = st.text_input('Max Heart Rate Achieved', help="Highest heart rate during a stress test. *To Calculate (Estimate):* 220 minus your age. *To Measure:* Recorded during a medically supervised stress test.")
+            slope = st.selectbox('Slope of Peak Exercise ST', [0,1,2], format_func=lambda x: {0:"Upsloping", 1:"Flat", 2:"Downsloping"}[x], help="The slope of the ST segment during peak exercise. *Standard Value:* 0 (Upsloping). *To Measure:* Recorded during a stress test.")
+        with col3:
+            cp = st.selectbox('Chest Pain Type', [0,1,2,3], format_func=lambda x: {0:"Typical Angina", 1:"Atypical Angina", 2:"Non-anginal", 3:"Asymptomatic"}[x], help="The type of chest pain experienced.")
+            fbs = st.selectbox('Fasting Blood Sugar > 120 mg/dl', [0,1], format_func=lambda x: "False" if x==0 else "True", help="Whether your fasting blood sugar is over 120 mg/dL. *Normal:* False (0). *To Measure:* Requires a blood test.")
+            exang = st.selectbox('Exercise Induced Angina', [0,1], format_func=lambda x: "No" if x==0 else "Yes", help="Whether you experience chest pain during exercise. *Normal:* No (0).")
+            ca = st.text_input('Major Vessels Colored', help="Number of major vessels (0-3) colored by flourosopy. *Normal:* 0. *To Measure:* A specialized imaging test.")
+
+        thal = st.selectbox('Thalassemia Defect', [1,2,3], format_func=lambda x: {1:"Normal", 2:"Fixed Defect", 3:"Reversible Defect"}[x], help="A blood disorder. *Normal:* 1. *To Measure:* Requires specific blood tests.")
+
+        submitted = st.form_submit_button('Predict Heart Disease Risk', use_container_width=True)
+
+    if submitted:
+        if heart_scorer:
+            show_prediction('heart', heart_scorer, [age, sex, cp, trestbps, chol, fbs, restecg, thalach, exang, oldpeak, slope, ca, thal], "heart disease")
         else:
             st.warning("Model not loaded. Please check your model files.")
 
+
 if selected == 'Heart Disease Prediction':
     st.title("Heart Disease Prediction")
     st.markdown("Enter the values below. Hover over the *(?)* for detailed information on each parameter.")
-    
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        age = st.text_input('Age', help="Your age in years.")
-        trestbps = st.text_input('Resting Blood Pressure', help="Systolic blood pressure (top number) in mm Hg. *Normal Range:* 90-120 mm Hg. *To Measure:* Use a home blood pressure monitor.")
-        restecg = st.selectbox('Resting ECG', [0,1,2], format_func=lambda x: {0:"Normal", 1:"ST-T Abnormality", 2:"Hypertrophy"}[x], help="Results of a resting electrocardiogram. *Standard Value:* 0 (Normal). *To Measure:* Requires an ECG test at a clinic.")
-        oldpeak = st.text_input('ST Depression', help="ST depression induced by exercise. *Normal Value:* 0. *To Measure:* Measured during a stress test by a medical professional.")
-    with col2:
-        sex = st.selectbox('Sex', [0,1], format_func=lambda x: "Female" if x==0 else "Male", help="Your biological sex.")
-        chol = st.text_input('Serum Cholesterol', help="Total cholesterol level. *Normal Range:* < 200 mg/dL. *To Measure:* Requires a blood test.")
-        thalach = st.text_input('Max Heart Rate Achieved', help="Highest heart rate during a stress test. *To Calculate (Estimate):* 220 minus your age. *To Measure:* Recorded during a medically supervised stress test.")
-        slope = st.selectbox('Slope of Peak Exercise ST', [0,1,2], format_func=lambda x: {0:"Upsloping", 1:"Flat", 2:"Downsloping"}[x], help="The slope of the ST segment during peak exercise. *Standard Value:* 0 (Upsloping). *To Measure:* Recorded during a stress test.")
-    with col3:
-        cp = st.selectbox('Chest Pain Type', [0,1,2,3], format_func=lambda x: {0:"Typical Angina", 1:"Atypical Angina", 2:"Non-anginal", 3:"Asymptomatic"}[x], help="The type of chest pain experienced.")
-        fbs = st.selectbox('Fasting Blood Sugar > 120 mg/dl', [0,1], format_func=lambda x: "False" if x==0 else "True", help="Whether your fasting blood sugar is over 120 mg/dL. *Normal:* False (0). *To Measure:* Requires a blood test.")
-        exang = st.selectbox('Exercise Induced Angina', [0,1], format_func=lambda x: "No" if x==0 else "Yes", help="Whether you experience chest pain during exercise. *Normal:* No (0).")
-        ca = st.text_input('Major Vessels Colored', help="Number of major vessels (0-3) colored by flourosopy. *Normal:* 0. *To Measure:* A specialized imaging test.")
-    
-    thal = st.selectbox('Thalassemia Defect', [1,2,3], format_func=lambda x: {1:"Normal", 2:"Fixed Defect", 3:"Reversible Defect"}[x], help="A blood disorder. *Normal:* 1. *To Measure:* Requires specific blood tests.")
-    
-    if st.button('Predict Heart Disease Risk', use_container_width=True):
-        if heart_model and heart_scaler:
-            # Placeholder for prediction logic
-            pass
+    heart_form()
+
+
+@st.fragment
+def parkinsons_form():
+    parkinsons_scorer = load_model('parkinsons')
+    with st.form('parkinsons_form', border=False):
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            MDVP_Fo = st.text_input('MDVP:Fo(Hz)', help="Average vocal fundamental frequency. *Normal Range (Male):* 85-180Hz. *Normal Range (Female):* 165-255Hz.")
+            MDVP_Jitter_percent = st.text_input('MDVP:Jitter(%)', help="Measure of frequency variation. *Standard:* < 1%.")
+            MDVP_Shimmer = st.text_input('MDVP:Shimmer', help="Measure of amplitude variation. *Standard:* Low values are healthier.")
+            HNR = st.text_input('HNR', help="Harmonics-to-Noise Ratio. Higher is better. *Standard:* > 20.")
+            NHR = st.text_input('NHR', help="Noise-to-Harmonics Ratio. Lower is better.")
+        with col2:
+            MDVP_Fhi = st.text_input('MDVP:Fhi(Hz)', help="Maximum vocal fundamental frequency.")
+            MDVP_Jitter_Abs = st.text_input('MDVP:Jitter(Abs)', help="Absolute jitter.")
+            MDVP_Shimmer_dB = st.text_input('MDVP:Shimmer(dB)', help="Shimmer in decibels.")
+            RPDE = st.text_input('RPDE', help="Recurrence Period Density Entropy.")
+            MDVP_APQ = st.text_input('MDVP:APQ', help="Eleven-point Amplitude Perturbation Quotient.")
+        with col3:
+            MDVP_Flo = st.text_input('MDVP:Flo(Hz)', help="Minimum vocal fundamental frequency.")
+            MDVP_RAP = st.text_input('MDVP:RAP', help="Relative Average Perturbation.")
+            Shimmer_APQ3 = st.text_input('Shimmer:APQ3', help="Three-point Amplitude Perturbation Quotient.")
+            spread1 = st.text_input('spread1', help="Nonlinear fundamental frequency variation.")
+            DFA = st.text_input('DFA', help="Detrended Fluctuation Analysis; signal fractal scaling exponent.")
+            D2 = st.text_input('D2', help="Correlation dimension.")
+        with col4:
+            MDVP_PPQ = st.text_input('MDVP:PPQ', help="Five-point Period Perturbation Quotient.")
+            Jitter_DDP = st.text_input('Jitter:DDP', help="Jitter difference of differences.")
+            Shimmer_APQ5 = st.text_input('Shimmer:APQ5', help="Five-point Amplitude Perturbation Quotient.")
+            spread2 = st.text_input('spread2', help="Nonlinear fundamental frequency variation.")
+            Shimmer_DDA = st.text_input('Shimmer:DDA', help="Average absolute difference between consecutive amplitude differences.")
+            PPE = st.text_input('PPE', help="Pitch Period Entropy.")
+
+        submitted = st.form_submit_button("Predict Parkinson's Risk", use_container_width=True)
+
+    if submitted:
+        if parkinsons_scorer:
+            show_prediction('parkinsons', parkinsons_scorer, [
+                MDVP_Fo, MDVP_Fhi, MDVP_Flo, MDVP_Jitter_percent, MDVP_Jitter_Abs, MDVP_RAP, MDVP_PPQ, Jitter_DDP,
+                MDVP_Shimmer, MDVP_Shimmer_dB, Shimmer_APQ3, Shimmer_APQ5, MDVP_APQ, Shimmer_DDA, NHR, HNR,
+                RPDE, DFA, spread1, spread2, D2, PPE,
+            ], "Parkinson's disease")
         else:
-             st.warning("Model not loaded. Please check your model files.")
+            st.warning("Model not loaded. Please check your model files.")
+
 
 if selected == "Parkinson's Prediction":
     st.title("Parkinson's Disease Prediction")
     st.markdown("Enter vocal measurements below. These are typically measured by specialized software. Hover over *(?)* for info.")
+    parkinsons_form()
 
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        MDVP_Fo = st.text_input('MDVP:Fo(Hz)', help="Average vocal fundamental frequency. *Normal Range (Male):* 85-180Hz. *Normal Range (Female):* 165-255Hz.")
-        MDVP_Jitter_percent = st.text_input('MDVP:Jitter(%)', help="Measure of frequency variation. *Standard:* < 1%.")
-        MDVP_Shimmer = st.text_input('MDVP:Shimmer', help="Measure of amplitude variation. *Standard:* Low values are healthier.")
-        HNR = st.text_input('HNR', help="Harmonics-to-Noise Ratio. Higher is better. *Standard:* > 20.")
-    with col2:
-        MDVP_Fhi = st.text_input('MDVP:Fhi(Hz)', help="Maximum vocal fundamental frequency.")
-        MDVP_Jitter_Abs = st.text_input('MDVP:Jitter(Abs)', help="Absolute jitter.")
-        MDVP_Shimmer_dB = st.text_input('MDVP:Shimmer(dB)', help="Shimmer in decibels.")
-        RPDE = st.text_input('RPDE', help="Recurrence Period Density Entropy.")
-    with col3:
-        MDVP_Flo = st.text_input('MDVP:Flo(Hz)', help="Minimum vocal fundamental frequency.")
-        MDVP_RAP = st.text_input('MDVP:RAP', help="Relative Average Perturbation.")
-        Shimmer_APQ3 = st.text_input('Shimmer:APQ3', help="Three-point Amplitude Perturbation Quotient.")
-        spread1 = st.text_input('spread1', help="Nonlinear fundamental frequency variation.")
-        D2 = st.text_input('D2', help="Correlation dimension.")
-    with col4:
-        MDVP_PPQ = st.text_input('MDVP:PPQ', help="Five-point Period Perturbation Quotient.")
-        Jitter_DDP = st.text_input('Jitter:DDP', help="Jitter difference of differences.")
-        Shimmer_APQ5 = st.text_input('Shimmer:APQ5', help="Five-point Amplitude Perturbation Quotient.")
-        spread2 = st.text_input('spread2', help="Nonlinear fundamental frequency variation.")
-        PPE = st.text_input('PPE', help="Pitch Period Entropy.")
-
-    if st.button("Predict Parkinson's Risk", use_container_width=True):
-        if parkinsons_model and parkinsons_scaler:
-            # Placeholder for prediction logic
-            pass
-        else:
-             st.warning("Model not loaded. Please check your model files.")
\ No newline at end of file
+# --- STARTUP TIMING REPORT ---
+timings = startup_timings()
+if timings['first_run_ms'] is None:
+    timings['first_run_ms'] = (time.perf_counter() - _script_start) * 1000
+    uptime = process_uptime()
+    timings['first_render_ms'] = uptime * 1000 if uptime is not None else None
+    since_start = f"{timings['first_render_ms']:.0f} ms after process start" if uptime is not None else "process start time unknown"
+    print(f"[startup] first render: {since_start}; first script run took {timings['first_run_ms']:.1f} ms")
+
+if os.environ.get('HEALTH_APP_TIMING'):
+    with st.sidebar.expander("Startup timing"):
+        if timings['first_render_ms'] is not None:
+            st.write(f"Process start to first render: {timings['first_render_ms']:.0f} ms")
+        st.write(f"First script run: {timings['first_run_ms']:.1f} ms")
+        for module_name, elapsed_ms in timings['imports_ms'].items():
+            st.write(f"First import of {module_name}: {elapsed_ms:.1f} ms")
+        for disease, elapsed_ms in timings['model_load_ms'].items():
+            st.write(f"{disease} model load: {elapsed_ms:.1f} ms")
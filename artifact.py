@@ -0,0 +1,158 @@
+"""
+Compact binary model artifacts that load without sklearn or pickle.
+
+Layout of a .hpm file (all integers little-endian):
+
+    bytes 0-3     magic b'HPMA'
+    bytes 4-5     format version (uint16)
+    bytes 6-7     reserved
+    bytes 8-11    header length in bytes (uint32)
+    bytes 12-     JSON header, space-padded so the data section starts on a 64-byte boundary
+    data section  float64 arrays mean, scale, coef, weights, each n_features long, back to back
+
+The header holds the disease, feature order, classes, intercept/bias, Platt
+parameters, the scaler's variances (for drift monitoring; absent in older files)
+and a SHA-256 checksum over the header fields and the data section.
+Because the arrays are contiguous and aligned they are np.memmap-ed read-only,
+so every process serving the same file shares one copy through the page cache.
+"""
+import hashlib
+import json
+import os
+import struct
+import sys
+
+import numpy as np
+
+from linear_scorer import LinearScorer
+
+MAGIC = b'HPMA'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+PREAMBLE = struct.Struct('<4sHHI')
+ARRAY_NAMES = ('mean', 'scale', 'coef', 'weights')
+DTYPE = np.dtype('<f8')
+REQUIRED_FIELDS = frozenset((
+    'n_features', 'feature_names', 'classes', 'intercept', 'bias', 'prob_a', 'prob_b', 'checksum',
+))
+
+
+class ArtifactError(ValueError):
+    """
+    Raised when a file is not a valid model artifact or fails its checksum.
+    """
+
+
+def _checksum(fields, data):
+    digest = hashlib.sha256(json.dumps(fields, sort_keys=True).encode())
+    digest.update(data)
+    return digest.hexdigest()
+
+
+def save_artifact(path, scorer, disease=None):
+    """
+    Writes `scorer` to `path` atomically (temp file + rename).
+    """
+    n_features = scorer.n_features
+    arrays = {name: np.ascontiguousarray(getattr(scorer, name), dtype=DTYPE) for name in ARRAY_NAMES}
+    data = b''.join(arrays[name].tobytes() for name in ARRAY_NAMES)
+
+    fields = {
+        'format_version': FORMAT_VERSION,
+        'disease': disease,
+        'n_features': n_features,
+        'feature_names': scorer.feature_names,
+        'classes': np.asarray(scorer.classes).tolist(),
+        'intercept': scorer.intercept,
+        'bias': scorer.bias,
+        'prob_a': scorer.prob_a,
+        'prob_b': scorer.prob_b,
+        # Not on the scoring path, so it lives in the header rather than the mapped data
+        'var': scorer.var.tolist() if scorer.var is not None else None,
+        'dtype': DTYPE.str,
+        'arrays': list(ARRAY_NAMES),
+    }
+    header = dict(fields, checksum=_checksum(fields, data))
+
+    header_bytes = json.dumps(header).encode()
+    padding = -(PREAMBLE.size + len(header_bytes)) % ALIGNMENT
+    header_bytes += b' ' * padding
+
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(PREAMBLE.pack(MAGIC, FORMAT_VERSION, 0, len(header_bytes)))
+        f.write(header_bytes)
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def read_header(path):
+    """
+    Returns (header_dict, data_offset) without touching the data section.
+    """
+    with open(path, 'rb') as f:
+        preamble = f.read(PREAMBLE.size)
+        if len(preamble) < PREAMBLE.size:
+            raise ArtifactError(f"{path} is too short to be a model artifact.")
+        magic, version, _, header_len = PREAMBLE.unpack(preamble)
+        if magic != MAGIC:
+            raise ArtifactError(f"{path} is not a model artifact.")
+        if version != FORMAT_VERSION:
+            raise ArtifactError(f"{path} has format version {version}; this build reads version {FORMAT_VERSION}.")
+        header_bytes = f.read(header_len)
+    if len(header_bytes) < header_len:
+        raise ArtifactError(f"{path} is truncated: its header runs past the end of the file.")
+    try:
+        header = json.loads(header_bytes)
+    except ValueError as e:  # JSONDecodeError and UnicodeDecodeError both subclass it
+        raise ArtifactError(f"{path} has a damaged header: {e}") from e
+    if not isinstance(header, dict) or not REQUIRED_FIELDS <= header.keys():
+        raise ArtifactError(f"{path} has a damaged header: expected the fields {sorted(REQUIRED_FIELDS)}.")
+    return header, PREAMBLE.size + header_len
+
+
+def load_artifact(path, verify=True):
+    """
+    Memory-maps an artifact and returns a LinearScorer backed by the mapped arrays.
+    """
+    header, data_offset = read_header(path)
+    n_features = header['n_features']
+    if isinstance(n_features, bool) or not isinstance(n_features, int) or n_features <= 0:
+        raise ArtifactError(f"{path} has a damaged header: n_features is {n_features!r}.")
+    n_values = n_features * len(ARRAY_NAMES)
+    if os.path.getsize(path) != data_offset + n_values * DTYPE.itemsize:
+        raise ArtifactError(f"{path} is truncated or has trailing data.")
+
+    data = np.memmap(path, dtype=DTYPE, mode='r', offset=data_offset, shape=(n_values,))
+    if verify:
+        fields = {key: value for key, value in header.items() if key != 'checksum'}
+        if _checksum(fields, memoryview(data).cast('B')) != header['checksum']:
+            raise ArtifactError(f"{path} failed its checksum.")
+
+    arrays = {name: data[i * n_features:(i + 1) * n_features] for i, name in enumerate(ARRAY_NAMES)}
+    return LinearScorer(
+        mean=arrays['mean'],
+        scale=arrays['scale'],
+        coef=arrays['coef'],
+        intercept=header['intercept'],
+        prob_a=header['prob_a'],
+        prob_b=header['prob_b'],
+        classes=header['classes'],
+        feature_names=header['feature_names'],
+        weights=arrays['weights'],
+        bias=header['bias'],
+        version=header['checksum'],
+        var=header.get('var'),
+    )
+
+
+if __name__ == "__main__":
+    # Usage: python artifact.py models/heart.hpm [...]
+    for artifact_path in sys.argv[1:]:
+        try:
+            info, _ = read_header(artifact_path)
+            load_artifact(artifact_path)
+        except (OSError, ArtifactError) as e:
+            print(f"{artifact_path}: INVALID ({e})")
+            continue
+        print(f"{artifact_path}: {info['disease']} v{info['format_version']}, {info['n_features']} features, sha256 {info['checksum'][:12]}")
@@ -0,0 +1,78 @@
+"""
+Compares the 'svc' and 'linear' training engines of train.py as the data grows.
+
+For each size a synthetic binary problem is generated, standardized and split
+80/20; each engine is timed on the training part and scored (ROC AUC, Brier) on
+the held-out part through the same LinearScorer path app.py uses. The libsvm
+engine is skipped above --svc-max-rows, where it stops finishing in useful time.
+
+Example:
+    python benchmarks/calibration.py --sizes 1000 10000 100000 1000000 --output calibration.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from sklearn.datasets import make_classification
+from sklearn.metrics import brier_score_loss, roc_auc_score
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from linear_scorer import LinearScorer  # noqa: E402
+from train import ENGINES, fit_classifier  # noqa: E402
+
+
+def run_case(n_rows, n_features, engine, seed=0):
+    X, y = make_classification(
+        n_samples=n_rows, n_features=n_features, n_informative=max(2, n_features // 2),
+        flip_y=0.05, class_sep=0.8, random_state=seed,
+    )
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, stratify=y, random_state=seed)
+
+    start = time.perf_counter()
+    scaler = StandardScaler().fit(X_train)
+    classifier = fit_classifier(scaler.transform(X_train), y_train, engine)
+    fit_seconds = time.perf_counter() - start
+
+    scorer = LinearScorer.from_estimators(classifier, scaler)
+    probabilities = scorer.predict_proba(X_test)[:, 1]
+    return {
+        'rows': n_rows,
+        'engine': engine,
+        'fit_seconds': fit_seconds,
+        'roc_auc': float(roc_auc_score(y_test, probabilities)),
+        'brier': float(brier_score_loss(y_test, probabilities)),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark training engines: fit time, AUC and Brier score.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument('--features', type=int, default=22, help="Feature count (22 matches the Parkinson's schema).")
+    parser.add_argument('--engines', nargs='+', choices=ENGINES, default=list(ENGINES))
+    parser.add_argument('--svc-max-rows', type=int, default=50_000, help="Skip the libsvm engine above this size.")
+    parser.add_argument('--output', help="Write results as JSON to this file.")
+    args = parser.parse_args(argv)
+
+    results = []
+    print(f"{'rows':>10} {'engine':>7} {'fit (s)':>9} {'AUC':>7} {'Brier':>7}")
+    for n_rows in args.sizes:
+        for engine in args.engines:
+            if engine == 'svc' and n_rows > args.svc_max_rows:
+                print(f"{n_rows:>10} {engine:>7} {'skipped':>9}")
+                continue
+            result = run_case(n_rows, args.features, engine)
+            results.append(result)
+            print(f"{n_rows:>10} {engine:>7} {result['fit_seconds']:>9.3f} {result['roc_auc']:>7.4f} {result['brier']:>7.4f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Closed-loop load generator for serve.py.
+
+Opens --connections keep-alive connections; each one sends a prediction, waits for
+the answer and immediately sends the next, for --duration seconds. Reports
+requests/sec and p50/p90/p99 latency as measured by the client.
+
+Example:
+    python serve.py --port 8000 &
+    python benchmarks/load_server.py --port 8000 --disease heart --connections 256 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+FEATURE_COUNTS = {'diabetes': 8, 'heart': 13, 'parkinsons': 22}
+
+
+async def _worker(host, port, disease, deadline, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    rng = random.Random()
+    try:
+        while time.perf_counter() < deadline:
+            body = json.dumps({'features': [rng.uniform(0, 2) for _ in range(FEATURE_COUNTS[disease])]}).encode()
+            request = (
+                f"POST /predict/{disease} HTTP/1.1\r\nHost: {host}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+            ).encode() + body
+
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+
+            status_line = await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                if name.lower() == 'content-length':
+                    length = int(value)
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            if not status_line.startswith(b'HTTP/1.1 200'):
+                errors.append(status_line)
+    finally:
+        writer.close()
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return float('nan')
+    index = min(len(sorted_values) - 1, int(round(q / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run(host, port, disease, connections, duration):
+    latencies, errors = [], []
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(_worker(host, port, disease, deadline, latencies, errors) for _ in range(connections)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'requests_per_second': len(latencies) / elapsed,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p90_ms': percentile(latencies, 90) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the serve.py prediction endpoint.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--disease', choices=sorted(FEATURE_COUNTS), default='heart')
+    parser.add_argument('--connections', type=int, default=64, help="Concurrent keep-alive connections.")
+    parser.add_argument('--duration', type=float, default=10.0, help="Seconds to run.")
+    parser.add_argument('--json', action='store_true', help="Print the result as JSON.")
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(run(args.host, args.port, args.disease, args.connections, args.duration))
+    if args.json:
+        print(json.dumps(result))
+    else:
+        print(f"{result['requests']:,} requests, {result['errors']} errors, {result['requests_per_second']:,.0f} req/s")
+        print(f"latency p50 {result['p50_ms']:.2f} ms | p90 {result['p90_ms']:.2f} ms | p99 {result['p99_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
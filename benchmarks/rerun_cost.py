@@ -0,0 +1,191 @@
+"""
+Headless measurement of what one interaction on a prediction page costs the server.
+
+For each prediction page this runs app.py under streamlit's AppTest and times three
+reruns:
+    - edit: one field changed, nothing submitted, and the whole script reruns (CSS
+      block, sidebar menu, page header and form, but no scoring or result), which
+      is what every field edit cost before the forms were moved into fragments
+    - full: the form is submitted and the whole script reruns, result included
+    - fragment: the form is submitted and only the page's fragment (form and result
+      pane) reruns, which is what a submission costs now
+and counts the deltas (element updates sent to the browser) each one produces.
+Times cover script execution only, from ScriptRunner's start event to its stop event.
+
+Filling a form used to cost one edit rerun per field plus one full rerun for the
+button; inside st.form, edits cost nothing until submit. The 'fill and submit'
+columns compare fields * edit + full (all measured) with one fragment rerun.
+
+    python benchmarks/rerun_cost.py
+    python benchmarks/rerun_cost.py --repeat 50 --output rerun.json
+
+AppTest always reruns the whole script, so fragment reruns are issued through a
+LocalScriptRunner subclass that queues the page's fragment id the way the browser
+does. That relies on streamlit internals: AppTest only keeps its fragments (which
+is where the ids come from) since 1.64, so this harness needs streamlit>=1.64,
+while the app itself runs on 1.37 and later.
+"""
+import argparse
+import dataclasses
+import json
+import os
+import sys
+import time
+from unittest.mock import patch
+
+import numpy as np
+import streamlit
+
+MIN_STREAMLIT = (1, 64)
+if tuple(int(part) for part in streamlit.__version__.split('.')[:2]) < MIN_STREAMLIT:
+    # Fail here rather than on one of the internal imports below
+    raise ImportError(f"benchmarks/rerun_cost.py needs streamlit>={'.'.join(map(str, MIN_STREAMLIT))}, "
+                      f"found {streamlit.__version__}.")
+
+from streamlit.runtime.scriptrunner import ScriptRunnerEvent  # noqa: E402
+from streamlit.runtime.scriptrunner_utils.script_requests import ScriptRequests  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+from streamlit.testing.v1 import app_test as app_test_module  # noqa: E402
+from streamlit.testing.v1.local_script_runner import LocalScriptRunner  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAGES = {
+    'diabetes': 'Diabetes Prediction',
+    'heart': 'Heart Disease Prediction',
+    'parkinsons': "Parkinson's Prediction",
+}
+
+
+class RecordingRunner(LocalScriptRunner):
+    """
+    Times script execution from ScriptRunner's start/stop events, which leaves out
+    AppTest's own per-run setup, and keeps the runner so its messages can be counted.
+    """
+
+    last = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        RecordingRunner.last = self
+        self.started = self.stopped = None
+        self.on_event.connect(self._time_event, weak=False)
+
+    def _time_event(self, sender, event, **kwargs):
+        if event == ScriptRunnerEvent.SCRIPT_STARTED:
+            self.started = time.perf_counter()
+        elif event in (ScriptRunnerEvent.SCRIPT_STOPPED_WITH_SUCCESS, ScriptRunnerEvent.FRAGMENT_STOPPED_WITH_SUCCESS):
+            self.stopped = time.perf_counter()
+
+
+class FragmentRunner(RecordingRunner):
+    """
+    Runs only the queued fragments instead of the whole script.
+    """
+
+    fragment_ids = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Drop the full-script run ScriptRunner queues on construction; it would
+        # absorb the fragment-scoped request below
+        self._requests = ScriptRequests()
+
+    def request_rerun(self, rerun_data):
+        return super().request_rerun(dataclasses.replace(rerun_data, fragment_id_queue=list(self.fragment_ids)))
+
+
+def _run(at, runner_class):
+    """
+    Returns (seconds executing, messages sent, bytes sent) for one rerun.
+    """
+    with patch.object(app_test_module, 'LocalScriptRunner', runner_class):
+        at.run()
+    if at.exception:
+        raise RuntimeError(f"app.py raised: {at.exception[0].value}")
+    runner = RecordingRunner.last
+    messages = [msg for msg in runner.forward_msgs() if msg.HasField('delta')]
+    return runner.stopped - runner.started, len(messages), sum(msg.ByteSize() for msg in messages)
+
+
+def _fill_form(at):
+    for text_input in at.text_input:
+        text_input.input('1')
+    at.button[-1].click()
+
+
+def _edit_field(at, i):
+    """
+    Changes one field to a new value without submitting.
+    """
+    text_input = at.text_input[i % len(at.text_input)]
+    text_input.input('2' if text_input.value == '1' else '1')
+
+
+def measure_page(app_path, page, repeat):
+    at = AppTest.from_file(app_path, default_timeout=60)
+    _run(at, RecordingRunner)  # warm-up: imports, model load, cache_resource
+    fields = len(at.text_input) + len(at.selectbox)
+
+    fragment_ids = list(at._fragment_storage._fragments)
+    if not fragment_ids:
+        raise RuntimeError(f"The {page!r} page registered no fragment.")
+    FragmentRunner.fragment_ids = fragment_ids
+
+    runs = {'edit': [], 'full': [], 'fragment': []}
+    for i in range(repeat):
+        _edit_field(at, i)
+        runs['edit'].append(_run(at, RecordingRunner))
+        for kind, runner_class in (('full', RecordingRunner), ('fragment', FragmentRunner)):
+            _fill_form(at)
+            runs[kind].append(_run(at, runner_class))
+            if not (at.success or at.error or at.warning):
+                raise RuntimeError(f"Submitting the {page!r} form rendered no result.")
+
+    result = {'fields': fields}
+    for kind, samples in runs.items():
+        result[f'{kind}_ms'] = float(np.median([sample[0] for sample in samples])) * 1000
+        result[f'{kind}_deltas'] = samples[-1][1]
+        result[f'{kind}_kb'] = samples[-1][2] / 1024
+    result['fill_and_submit_before_ms'] = fields * result['edit_ms'] + result['full_ms']
+    result['fill_and_submit_after_ms'] = result['fragment_ms']
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure full-script vs fragment rerun cost of the prediction pages.")
+    parser.add_argument('--app', default=os.path.join(ROOT, 'app.py'))
+    parser.add_argument('--diseases', nargs='+', choices=sorted(PAGES), default=sorted(PAGES))
+    parser.add_argument('--repeat', type=int, default=20, help="Timed reruns per measurement.")
+    parser.add_argument('--output', help="Write results as JSON (benchmarks/run.py format) to this file.")
+    args = parser.parse_args(argv)
+
+    # The app loads models/ relative to its own directory
+    app_path = os.path.abspath(args.app)
+    os.chdir(os.path.dirname(app_path))
+
+    metrics = {}
+    print(f"{'page':<12} {'edit rerun':>11} {'full submit':>11} {'fragment':>11} {'deltas':>11} {'delta kB':>14} {'fill and submit':>24}")
+    for disease in args.diseases:
+        page = PAGES[disease]
+        # Select the page without the browser-side menu component
+        with patch('streamlit_option_menu.option_menu', lambda *a, **k: page):
+            result = measure_page(app_path, page, args.repeat)
+        for name, value in result.items():
+            metrics[f'rerun.{disease}.{name}'] = value
+        print(
+            f"{disease:<12} {result['edit_ms']:>8.1f} ms {result['full_ms']:>8.1f} ms {result['fragment_ms']:>8.1f} ms "
+            f"{result['full_deltas']:>4} -> {result['fragment_deltas']:<4} "
+            f"{result['full_kb']:>5.1f} -> {result['fragment_kb']:<5.1f} "
+            f"{result['fill_and_submit_before_ms']:>8.1f} ms -> {result['fill_and_submit_after_ms']:.1f} ms"
+        )
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'meta': {'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'repeat': args.repeat}, 'metrics': metrics}, f, indent=2)
+        print(f"Results written to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
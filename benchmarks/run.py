@@ -0,0 +1,207 @@
+"""
+Benchmark suite for the prediction and training hot paths.
+
+Measures, per disease, on synthetic data shaped like the real datasets:
+    - train_and_save_model fit time as the row count grows
+    - model load time (memory-mapped artifact, joblib pickles, cold start in a fresh process)
+    - single-row predict_proba latency (median and p99)
+    - batch throughput at several batch sizes
+    - the per-prediction cost of the metrics.py instrumentation
+and the peak RSS of the whole run. Results are written as flat JSON metrics.
+
+    python benchmarks/run.py --output bench.json
+    python benchmarks/run.py --output bench.json --compare baseline.json     # run, then flag regressions
+    python benchmarks/run.py --input bench.json --compare baseline.json      # compare existing results only
+
+Metrics ending in '_per_second' are better when higher; every other metric is a
+time or a size and is better when lower. A metric regresses when it is worse than
+the baseline by more than --threshold (relative); the exit status is then 1.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import make_dataset, write_dataset  # noqa: E402
+from dataset_cache import load_dataset  # noqa: E402
+from diseases import DISEASES, dataset_schema, load_scorer, model_paths  # noqa: E402
+from metrics import measure_flush_cost, measure_overhead  # noqa: E402
+from train import train_and_save_model, training_job  # noqa: E402
+
+BATCH_SIZES = [1, 16, 256, 4096, 65536]
+
+
+def _timed(fn, repeat):
+    """
+    Calls fn() `repeat` times and returns the per-call durations in seconds.
+    """
+    durations = np.empty(repeat)
+    for i in range(repeat):
+        start = time.perf_counter_ns()
+        fn()
+        durations[i] = (time.perf_counter_ns() - start) / 1e9
+    return durations
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def bench_training(disease, sizes, workdir, engine):
+    metrics = {}
+    spec = DISEASES[disease]
+    model_dir = os.path.join(workdir, 'models')
+    dataset_cache_dir = os.path.join(workdir, 'dataset_cache')
+    for n_rows in sizes:
+        dataset = write_dataset(disease, n_rows, os.path.join(workdir, 'datasets', f'{disease}_{n_rows}.csv'))
+        start = time.perf_counter()
+        report = train_and_save_model(**training_job(disease, model_dir, dataset), engine=engine, dataset_cache_dir=dataset_cache_dir)
+        if report is None:
+            raise RuntimeError(f"Training {disease} on {n_rows} rows failed.")
+        metrics[f'train.{disease}.{n_rows}_rows.fit_seconds'] = report['timings']['fit']
+        metrics[f'train.{disease}.{n_rows}_rows.total_seconds'] = time.perf_counter() - start
+
+        # First run parsed the CSV and filled the cache; a repeated run memory-maps it
+        cached = load_dataset(dataset, spec['target_column'], spec['id_column'], dataset_schema(disease), dataset_cache_dir,
+                              spec['feature_columns'])[3]
+        metrics[f'train.{disease}.{n_rows}_rows.parse_seconds'] = report['dataset_cache']['parse_seconds']
+        metrics[f'train.{disease}.{n_rows}_rows.cached_load_seconds'] = cached['load_seconds']
+    return metrics
+
+
+def bench_load(disease, model_dir, repeat):
+    import joblib
+
+    model_path, scaler_path = model_paths(disease, model_dir)
+    artifact = _timed(lambda: load_scorer(disease, model_dir), repeat)
+    pickles = _timed(lambda: (joblib.load(model_path), joblib.load(scaler_path)), repeat)
+
+    # Cold start: fresh interpreter, imports included
+    code = (
+        "import time; start = time.perf_counter(); "
+        "from diseases import load_scorer; "
+        f"load_scorer({disease!r}, {model_dir!r}); "
+        "print(time.perf_counter() - start)"
+    )
+    cold = float(subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True).stdout)
+
+    return {
+        f'load.{disease}.artifact_ms': float(np.median(artifact)) * 1000,
+        f'load.{disease}.pickle_ms': float(np.median(pickles)) * 1000,
+        f'load.{disease}.cold_start_ms': cold * 1000,
+    }
+
+
+def bench_predict(disease, model_dir, repeat):
+    scorer = load_scorer(disease, model_dir)
+    X = make_dataset(disease, max(BATCH_SIZES), seed=1)[DISEASES[disease]['feature_columns']].to_numpy()
+
+    row = X[:1]
+    single = _timed(lambda: scorer.predict_proba(row), repeat)
+    metrics = {
+        f'predict.{disease}.single_row_p50_us': float(np.median(single)) * 1e6,
+        f'predict.{disease}.single_row_p99_us': float(np.percentile(single, 99)) * 1e6,
+    }
+    for batch_size in BATCH_SIZES:
+        batch = X[:batch_size]
+        calls = max(3, min(repeat, 200_000 // batch_size))
+        seconds = np.median(_timed(lambda: scorer.predict_proba(batch), calls))
+        metrics[f'predict.{disease}.batch_{batch_size}.rows_per_second'] = batch_size / seconds
+    return metrics
+
+
+def run_suite(diseases, train_sizes, engine, repeat):
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for disease in diseases:
+            print(f"Benchmarking {disease}...", file=sys.stderr)
+            results.update(bench_training(disease, train_sizes, workdir, engine))
+            model_dir = os.path.join(workdir, 'models')
+            results.update(bench_load(disease, model_dir, max(10, repeat // 100)))
+            results.update(bench_predict(disease, model_dir, repeat))
+    results['metrics.overhead_per_prediction_us'] = measure_overhead()
+    results['metrics.flush_4096_ms'] = measure_flush_cost()
+    results['process.peak_rss_mb'] = peak_rss_mb()
+    return {
+        'meta': {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'engine': engine,
+            'train_sizes': train_sizes,
+        },
+        'metrics': results,
+    }
+
+
+def higher_is_better(name):
+    return name.endswith('_per_second')
+
+
+def compare(current, baseline, threshold):
+    """
+    Returns a list of (name, baseline, current, relative_change, regressed) for metrics in both runs.
+    """
+    rows = []
+    for name in sorted(set(current['metrics']) & set(baseline['metrics'])):
+        old, new = baseline['metrics'][name], current['metrics'][name]
+        change = (new - old) / old if old else 0.0
+        worse = -change if higher_is_better(name) else change
+        rows.append((name, old, new, change, worse > threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark prediction and training hot paths.")
+    parser.add_argument('--diseases', nargs='+', choices=sorted(DISEASES), default=sorted(DISEASES))
+    parser.add_argument('--train-sizes', type=int, nargs='+', default=[1_000, 4_000, 16_000])
+    parser.add_argument('--engine', choices=('svc', 'linear'), default='svc')
+    parser.add_argument('--repeat', type=int, default=2_000, help="Timed calls per latency measurement.")
+    parser.add_argument('--output', help="Write results as JSON to this file.")
+    parser.add_argument('--input', help="Skip the run and load results from this JSON file instead.")
+    parser.add_argument('--compare', help="Baseline JSON to compare against.")
+    parser.add_argument('--threshold', type=float, default=0.15, help="Relative change counted as a regression (default: 0.15).")
+    args = parser.parse_args(argv)
+
+    if args.input:
+        with open(args.input) as f:
+            current = json.load(f)
+    else:
+        current = run_suite(args.diseases, args.train_sizes, args.engine, args.repeat)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(current, f, indent=2)
+            print(f"Results written to {args.output}", file=sys.stderr)
+        else:
+            print(json.dumps(current, indent=2))
+
+    if not args.compare:
+        return 0
+
+    with open(args.compare) as f:
+        baseline = json.load(f)
+    rows = compare(current, baseline, args.threshold)
+    regressions = [row for row in rows if row[4]]
+    for name, old, new, change, regressed in rows:
+        flag = 'REGRESSION' if regressed else ''
+        print(f"{name:<55} {old:>14.4g} {new:>14.4g} {change:>+8.1%} {flag}")
+    print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%} across {len(rows)} shared metrics.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
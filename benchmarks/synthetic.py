@@ -0,0 +1,50 @@
+"""
+Synthetic datasets shaped like the real ones: same columns, target and id column
+per disease (diabetes 8 features, heart 13, parkinsons 22), with labels drawn from
+a noisy linear model so the classifiers have something to learn.
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from diseases import DISEASES  # noqa: E402
+
+
+def make_dataset(disease, n_rows, seed=0):
+    """
+    Returns a DataFrame with the disease's feature columns, target column and id column (if any).
+    """
+    spec = DISEASES[disease]
+    columns = spec['feature_columns']
+    rng = np.random.default_rng(seed)
+
+    means = rng.uniform(1.0, 200.0, len(columns))
+    scales = means * rng.uniform(0.05, 0.5, len(columns))
+    X = rng.normal(means, scales, size=(n_rows, len(columns)))
+
+    weights = rng.normal(size=len(columns))
+    logits = ((X - means) / scales) @ weights / np.sqrt(len(columns)) * 2.0
+    y = (rng.random(n_rows) < 1.0 / (1.0 + np.exp(-logits))).astype(np.int64)
+
+    df = pd.DataFrame(X, columns=columns)
+    if spec['id_column']:
+        df.insert(0, spec['id_column'], [f'synthetic_{i}' for i in range(n_rows)])
+    df[spec['target_column']] = y
+    return df
+
+
+def write_dataset(disease, n_rows, path, seed=0):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    make_dataset(disease, n_rows, seed).to_csv(path, index=False)
+    return path
+
+
+if __name__ == "__main__":
+    # Usage: python benchmarks/synthetic.py heart 100000 datasets/heart_synthetic.csv
+    target_disease, rows, output_path = sys.argv[1], int(sys.argv[2]), sys.argv[3]
+    write_dataset(target_disease, rows, output_path)
+    print(f"Wrote {rows:,} synthetic {target_disease} rows to {output_path}")
@@ -0,0 +1,61 @@
+import numpy as np
+
+
+def fit_platt(decision_values, positive, max_iter=100, min_step=1e-10, sigma=1e-12, eps=1e-5):
+    """
+    Fits Platt's sigmoid P(positive) = 1 / (1 + exp(A * f + B)) and returns (A, B).
+
+    A NumPy port of libsvm's sigmoid_train (Newton's method with backtracking and
+    the same prior-corrected targets), so parameters fitted here mean exactly what
+    SVC's probA_/probB_ mean. For a binary sklearn model call it with
+    decision_values = -decision_function(X) and positive = (y == classes_[0]).
+    """
+    f = np.asarray(decision_values, dtype=np.float64).ravel()
+    positive = np.asarray(positive, dtype=bool).ravel()
+    prior1 = float(positive.sum())
+    prior0 = float(positive.size - prior1)
+
+    hi_target = (prior1 + 1.0) / (prior1 + 2.0)
+    lo_target = 1.0 / (prior0 + 2.0)
+    t = np.where(positive, hi_target, lo_target)
+
+    def objective(a, b):
+        f_apb = f * a + b
+        return float(np.sum(t * f_apb + np.logaddexp(0.0, -f_apb)))
+
+    a = 0.0
+    b = float(np.log((prior0 + 1.0) / (prior1 + 1.0)))
+    fval = objective(a, b)
+
+    for _ in range(max_iter):
+        f_apb = f * a + b
+        p = np.exp(-np.logaddexp(0.0, f_apb))
+        q = 1.0 - p
+        d2 = p * q
+        h11 = sigma + float(np.dot(f * f, d2))
+        h22 = sigma + float(d2.sum())
+        h21 = float(np.dot(f, d2))
+        d1 = t - p
+        g1 = float(np.dot(f, d1))
+        g2 = float(d1.sum())
+        if abs(g1) < eps and abs(g2) < eps:
+            break
+
+        det = h11 * h22 - h21 * h21
+        d_a = -(h22 * g1 - h21 * g2) / det
+        d_b = -(-h21 * g1 + h11 * g2) / det
+        gd = g1 * d_a + g2 * d_b
+
+        step = 1.0
+        while step >= min_step:
+            new_a = a + step * d_a
+            new_b = b + step * d_b
+            new_f = objective(new_a, new_b)
+            if new_f < fval + 0.0001 * step * gd:
+                a, b, fval = new_a, new_b, new_f
+                break
+            step /= 2.0
+        if step < min_step:
+            break
+
+    return a, b
@@ -0,0 +1,190 @@
+"""
+Cache of parsed training datasets as memory-mappable .npy arrays.
+
+load_dataset() parses a CSV once with an explicit dtype schema, selects the
+feature columns in schema order (so a CSV with reordered columns still trains a
+model whose weights line up with the rows app.py and serve.py build) and stores
+the float64 feature matrix and the target vector under a key built from the
+file's SHA-256 and the column configuration. Later calls with the same file
+contents and configuration memory-map the arrays (np.load with mmap_mode='r')
+instead of parsing, so repeated training runs skip read_csv entirely. Editing
+the CSV, or changing the target/id column, the feature columns or the schema,
+changes the key; stale entries are simply never read again.
+
+    python dataset_cache.py            # list cached datasets
+    python dataset_cache.py --clear    # delete them
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+
+CACHE_DIR = '.dataset_cache'
+
+# Bump when the on-disk layout or the preprocessing changes, to orphan old entries
+CACHE_FORMAT = 1
+
+
+def file_digest(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_key(content_digest, target_column, id_column, dtypes, feature_columns=None):
+    config = {
+        'format': CACHE_FORMAT,
+        'target_column': target_column,
+        'id_column': id_column,
+        'dtypes': dtypes or {},
+        'feature_columns': feature_columns,
+    }
+    return hashlib.sha256((content_digest + json.dumps(config, sort_keys=True)).encode()).hexdigest()
+
+
+def parse_dataset(dataset_path, target_column, id_column=None, dtypes=None, feature_columns=None):
+    """
+    Reads a CSV into (X, y, feature_names): float64 features without the target and id columns.
+
+    With `feature_columns` the features are selected in that order, whatever the file's
+    column order, and any other columns are ignored; without it they keep the file order.
+    """
+    import pandas as pd
+
+    df = pd.read_csv(dataset_path, dtype=dtypes)
+    if feature_columns is not None:
+        missing = [column for column in feature_columns if column not in df.columns]
+        if missing:
+            raise ValueError(f"{dataset_path} is missing feature columns {missing}")
+        feature_names = list(feature_columns)
+    else:
+        feature_names = [column for column in df.columns if column not in (target_column, id_column)]
+    X = np.ascontiguousarray(df[feature_names].to_numpy(dtype=np.float64))
+    y = df[target_column].to_numpy()
+    return X, y, feature_names
+
+
+def load_dataset(dataset_path, target_column, id_column=None, dtypes=None, cache_dir=CACHE_DIR, feature_columns=None):
+    """
+    Returns (X, y, feature_names, info), loading memory-mapped arrays from the cache when possible.
+
+    `info` says whether the cache was hit and how long hashing, loading and the
+    original parse took; 'saved_seconds' is the parse time a hit avoided.
+    With cache_dir=None the CSV is always parsed and nothing is written.
+    """
+    start = time.perf_counter()
+    if cache_dir is None:
+        X, y, feature_names = parse_dataset(dataset_path, target_column, id_column, dtypes, feature_columns)
+        elapsed = time.perf_counter() - start
+        return X, y, feature_names, {'hit': False, 'parse_seconds': elapsed, 'load_seconds': elapsed, 'saved_seconds': 0.0}
+
+    digest = file_digest(dataset_path)
+    key = cache_key(digest, target_column, id_column, dtypes, feature_columns)
+    hash_seconds = time.perf_counter() - start
+    entry_dir = os.path.join(cache_dir, key[:32])
+    info = {'key': key, 'hash_seconds': hash_seconds}
+
+    try:
+        with open(os.path.join(entry_dir, 'meta.json')) as f:
+            meta = json.load(f)
+        X = np.load(os.path.join(entry_dir, 'X.npy'), mmap_mode='r')
+        y = np.load(os.path.join(entry_dir, 'y.npy'), mmap_mode='r')
+        load_seconds = time.perf_counter() - start
+        info.update(hit=True, parse_seconds=meta['parse_seconds'], load_seconds=load_seconds,
+                    saved_seconds=max(0.0, meta['parse_seconds'] - load_seconds))
+        return X, y, meta['feature_names'], info
+    except (FileNotFoundError, ValueError, KeyError):
+        pass  # Not cached yet, or a damaged entry that gets rewritten below
+
+    parse_start = time.perf_counter()
+    X, y, feature_names = parse_dataset(dataset_path, target_column, id_column, dtypes, feature_columns)
+    parse_seconds = time.perf_counter() - parse_start
+
+    try:
+        if y.dtype.hasobject:
+            raise OSError(f"target column '{target_column}' is not numeric and can't be memory-mapped")
+        _write_entry(entry_dir, X, y, {
+            'source': dataset_path,
+            'sha256': digest,
+            'target_column': target_column,
+            'id_column': id_column,
+            'dtypes': dtypes,
+            'feature_names': feature_names,
+            'rows': int(X.shape[0]),
+            'parse_seconds': parse_seconds,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        })
+    except OSError as e:
+        print(f"Warning: could not cache {dataset_path}: {e}")
+
+    info.update(hit=False, parse_seconds=parse_seconds, load_seconds=time.perf_counter() - start, saved_seconds=0.0)
+    return X, y, feature_names, info
+
+
+def _write_entry(entry_dir, X, y, meta):
+    # Build the entry in a private directory and rename it into place, so readers
+    # never see a partial entry and concurrent writers of the same key are harmless
+    tmp_dir = f'{entry_dir}.tmp{os.getpid()}'
+    os.makedirs(tmp_dir, exist_ok=True)
+    np.save(os.path.join(tmp_dir, 'X.npy'), X)
+    np.save(os.path.join(tmp_dir, 'y.npy'), y)
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+    try:
+        os.rename(tmp_dir, entry_dir)
+    except OSError:
+        # Another process cached the same key first (or a damaged entry is in the way)
+        if os.path.exists(os.path.join(entry_dir, 'meta.json')):
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        else:
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            os.rename(tmp_dir, entry_dir)
+
+
+def cached_entries(cache_dir=CACHE_DIR):
+    """
+    Returns (entry_dir, meta, bytes) for every complete cache entry.
+    """
+    entries = []
+    if not os.path.isdir(cache_dir):
+        return entries
+    for name in sorted(os.listdir(cache_dir)):
+        entry_dir = os.path.join(cache_dir, name)
+        try:
+            with open(os.path.join(entry_dir, 'meta.json')) as f:
+                meta = json.load(f)
+        except (FileNotFoundError, NotADirectoryError, ValueError):
+            continue
+        size = sum(os.path.getsize(os.path.join(entry_dir, file)) for file in os.listdir(entry_dir))
+        entries.append((entry_dir, meta, size))
+    return entries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or clear the parsed-dataset cache.")
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('--clear', action='store_true', help="Delete every cached dataset.")
+    args = parser.parse_args(argv)
+
+    if args.clear:
+        shutil.rmtree(args.cache_dir, ignore_errors=True)
+        print(f"Cleared {args.cache_dir}")
+        return 0
+
+    entries = cached_entries(args.cache_dir)
+    for entry_dir, meta, size in entries:
+        print(f"{os.path.basename(entry_dir)[:12]}  {meta['source']:<32} {meta['rows']:>10,} rows "
+              f"{size / 1e6:>9.1f} MB  parsed in {meta['parse_seconds']:.2f}s  {meta['created']}")
+    print(f"{len(entries)} cached dataset(s) in {args.cache_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+import hashlib
+import os
+
+from artifact import load_artifact
+from linear_scorer import LinearScorer
+
+# --- DISEASE SCHEMAS ---
+# Feature columns are listed in training order: train.py and train_stream.py select
+# them in this order whatever the CSV's column order, every caller builds rows in
+# this order, and load_scorer rejects a model whose feature names differ from it.
+DISEASES = {
+    'diabetes': {
+        'dataset_path': 'datasets/diabetes.csv',
+        'target_column': 'Outcome',
+        'id_column': None,
+        'feature_columns': [
+            'Pregnancies', 'Glucose', 'BloodPressure', 'SkinThickness', 'Insulin', 'BMI',
+            'DiabetesPedigreeFunction', 'Age',
+        ],
+    },
+    'heart': {
+        'dataset_path': 'datasets/heart.csv',
+        'target_column': 'target',
+        'id_column': None,
+        'feature_columns': [
+            'age', 'sex', 'cp', 'trestbps', 'chol', 'fbs', 'restecg', 'thalach', 'exang', 'oldpeak',
+            'slope', 'ca', 'thal',
+        ],
+    },
+    'parkinsons': {
+        'dataset_path': 'datasets/parkinsons.csv',
+        'target_column': 'status',
+        'id_column': 'name',
+        'feature_columns': [
+            'MDVP:Fo(Hz)', 'MDVP:Fhi(Hz)', 'MDVP:Flo(Hz)', 'MDVP:Jitter(%)', 'MDVP:Jitter(Abs)', 'MDVP:RAP',
+            'MDVP:PPQ', 'Jitter:DDP', 'MDVP:Shimmer', 'MDVP:Shimmer(dB)', 'Shimmer:APQ3', 'Shimmer:APQ5',
+            'MDVP:APQ', 'Shimmer:DDA', 'NHR', 'HNR', 'RPDE', 'DFA', 'spread1', 'spread2', 'D2', 'PPE',
+        ],
+    },
+}
+
+MODEL_DIR = 'models'
+
+
+def dataset_schema(disease):
+    """
+    Explicit read_csv dtypes for a disease's dataset: float64 features, an int64 target
+    and a string id column, so parsing never has to infer types.
+    """
+    spec = DISEASES[disease]
+    dtypes = {column: 'float64' for column in spec['feature_columns']}
+    dtypes[spec['target_column']] = 'int64'
+    if spec['id_column']:
+        dtypes[spec['id_column']] = 'str'
+    return dtypes
+
+
+def model_paths(disease, model_dir=MODEL_DIR):
+    """
+    Returns the (model_path, scaler_path) pair that train.py writes for a disease.
+    """
+    return (
+        os.path.join(model_dir, f'{disease}_model.pkl'),
+        os.path.join(model_dir, f'{disease}_scaler.pkl'),
+    )
+
+
+def artifact_path(disease, model_dir=MODEL_DIR):
+    """
+    Returns the path of the compact binary artifact train.py exports for a disease.
+    """
+    return os.path.join(model_dir, f'{disease}.hpm')
+
+
+def load_scorer(disease, model_dir=MODEL_DIR):
+    """
+    Loads a disease's model as a LinearScorer.
+
+    The memory-mapped .hpm artifact is preferred; it needs neither sklearn nor
+    unpickling. Older model directories without one fall back to the joblib pickles.
+    Raises ValueError if the model wasn't trained on the schema's feature columns in
+    schema order, since every caller passes rows in that order.
+    """
+    path = artifact_path(disease, model_dir)
+    if os.path.exists(path):
+        scorer = load_artifact(path)
+    else:
+        import joblib  # Unpickling pulls in sklearn, so only pay for it on the fallback path
+
+        model_path, scaler_path = model_paths(disease, model_dir)
+        model = joblib.load(model_path)
+        scaler = joblib.load(scaler_path)
+        scorer = LinearScorer.from_estimators(model, scaler, version=_files_digest(model_path, scaler_path))
+    _check_features(disease, scorer)
+    return scorer
+
+
+def _check_features(disease, scorer):
+    expected = DISEASES[disease]['feature_columns']
+    # Models fitted on bare arrays carry no names; their width is all that can be checked
+    if scorer.feature_names is not None and list(scorer.feature_names) != expected:
+        raise ValueError(
+            f"The {disease} model was trained on features {scorer.feature_names}, "
+            f"but the schema expects {expected} in that order; retrain it with train.py."
+        )
+    if scorer.n_features != len(expected):
+        raise ValueError(f"The {disease} model takes {scorer.n_features} features, but the schema has {len(expected)}.")
+
+
+def model_files(disease, model_dir=MODEL_DIR):
+    """
+    Returns the files load_scorer would read for a disease, in the same order of preference.
+    """
+    path = artifact_path(disease, model_dir)
+    if os.path.exists(path):
+        return [path]
+    return list(model_paths(disease, model_dir))
+
+
+def model_signature(disease, model_dir=MODEL_DIR):
+    """
+    Cheap stat-based fingerprint (path, mtime, size) of a disease's model files.
+
+    Missing files yield None entries, so a deleted or newly written file also changes it.
+    """
+    signature = []
+    for path in model_files(disease, model_dir):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            signature.append((path, None, None))
+            continue
+        signature.append((path, stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+def _files_digest(*paths):
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def detect_disease(columns):
+    """
+    Picks the disease whose feature columns are all present in `columns`.
+
+    When several schemas fit (a wide extract can contain more than one), the one
+    with the most features wins; returns None if nothing matches.
+    """
+    available = set(columns)
+    matches = [name for name, spec in DISEASES.items() if set(spec['feature_columns']) <= available]
+    if not matches:
+        return None
+    return max(matches, key=lambda name: len(DISEASES[name]['feature_columns']))
@@ -0,0 +1,320 @@
+"""
+Input-drift monitoring against the training statistics stored in each model's scaler.
+
+A DriftMonitor keeps, per feature and in constant memory, the running count, mean
+and variance of every input it sees (Welford, merged batch-wise with Chan et al.'s
+parallel update) and a fixed-bin histogram of the standardized values
+(x - mean_) / scale_ for quantiles. Its report compares the running mean and
+variance with the scaler's mean_ and var_ and flags features that moved too far.
+
+Online use costs one deque append per prediction; rows are folded into the
+statistics in vectorized batches of `buffer_rows`:
+
+    monitor = DriftMonitor.from_scorer(scorer, feature_names)
+    monitor.observe(row)                  # per prediction
+    monitor.report()                      # per-feature dicts, 'drifted' flag included
+
+Batch mode over any CSV holding the feature columns, or while scoring one:
+
+    python drift_monitor.py extract.csv --disease heart --json drift.json
+    python score_csv.py extract.csv scored.csv --drift-report drift.json
+
+Quantiles beyond +/-8 training standard deviations are clamped to the histogram edge.
+Rows with a non-finite value, or one more than MAX_Z training standard deviations
+out (big enough to overflow the running moments), are skipped and counted.
+"""
+import argparse
+import json
+import sys
+import threading
+from collections import deque
+
+import numpy as np
+
+from diseases import DISEASES, MODEL_DIR, detect_disease, load_scorer
+
+# Histogram of standardized values: [-Z_RANGE, Z_RANGE] in BIN_WIDTH steps, plus one
+# underflow and one overflow bin
+Z_RANGE = 8.0
+BIN_WIDTH = 0.05
+
+# Inputs further out than this are data-entry garbage; their squares would overflow M2
+MAX_Z = 1e12
+
+
+class DriftMonitor:
+    """
+    Running per-feature statistics of model inputs, compared with the training reference.
+
+    A feature is flagged once at least `min_count` rows were seen and either its mean
+    moved more than `mean_threshold` training standard deviations, or its variance
+    is more than `variance_ratio` times larger or smaller than the training variance.
+    `variance` is the scaler's var_; without it scale ** 2 is used. Features that were
+    constant in training (var_ 0; sklearn then sets scale_ to 1) have no variance to
+    compare with and are only checked for a mean shift.
+    `on_drift(features)` is called with the names of newly flagged features after a flush.
+
+    observe() is thread-safe; the statistics and the set of flagged features are
+    updated under a lock, so concurrent callers report each newly drifted feature once.
+    """
+
+    def __init__(self, mean, scale, variance=None, feature_names=None, version=None, mean_threshold=0.5,
+                 variance_ratio=2.0, min_count=100, buffer_rows=256, on_drift=None):
+        self.reference_mean = np.asarray(mean, dtype=np.float64)
+        self.reference_scale = np.asarray(scale, dtype=np.float64)
+        self.reference_variance = (np.asarray(variance, dtype=np.float64) if variance is not None
+                                   else self.reference_scale ** 2)
+        n_features = self.reference_mean.shape[0]
+        self.feature_names = list(feature_names) if feature_names is not None else [f'x{i}' for i in range(n_features)]
+        self.version = version
+        self.mean_threshold = mean_threshold
+        self.variance_ratio = variance_ratio
+        self.min_count = min_count
+        self.buffer_rows = buffer_rows
+        self.on_drift = on_drift
+
+        self.count = 0
+        self.skipped = 0
+        self.mean = np.zeros(n_features)
+        self.m2 = np.zeros(n_features)
+        self.n_bins = int(round(2 * Z_RANGE / BIN_WIDTH)) + 2
+        self.histogram = np.zeros((n_features, self.n_bins), dtype=np.int64)
+        self._flagged = set()
+        self._buffer = deque()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_scorer(cls, scorer, feature_names=None, **kwargs):
+        """
+        Uses the scaler statistics folded into a LinearScorer as the reference.
+        """
+        return cls(scorer.mean, scorer.scale, scorer.var, feature_names or scorer.feature_names, scorer.version, **kwargs)
+
+    @property
+    def n_features(self):
+        return self.reference_mean.shape[0]
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else np.full(self.n_features, np.nan)
+
+    def observe(self, row):
+        """
+        Records one input row; the statistics catch up every `buffer_rows` rows.
+        """
+        self._buffer.append(row)
+        if len(self._buffer) >= self.buffer_rows:
+            self.flush()
+
+    def update(self, X):
+        """
+        Folds an (N, d) batch into the statistics right away.
+        """
+        with self._lock:
+            self._update(np.asarray(X, dtype=np.float64).reshape(-1, self.n_features))
+        self._check()
+
+    def flush(self):
+        rows = []
+        while True:
+            try:
+                rows.append(self._buffer.popleft())
+            except IndexError:
+                break
+        if rows:
+            self.update(rows)
+
+    def summary(self):
+        """
+        Returns the statistics as a picklable (count, mean, m2, histogram, skipped) tuple.
+        """
+        self.flush()
+        with self._lock:
+            return self.count, self.mean.copy(), self.m2.copy(), self.histogram.copy(), self.skipped
+
+    def merge_summary(self, summary):
+        """
+        Adds statistics gathered against the same reference elsewhere (e.g. in a worker process).
+        """
+        count, mean, m2, histogram, skipped = summary
+        with self._lock:
+            self._merge_moments(count, mean, m2)
+            self.histogram += histogram
+            self.skipped += skipped
+        self._check()
+
+    def quantiles(self, qs=(0.05, 0.5, 0.95)):
+        """
+        Returns a (len(qs), d) array of estimated quantiles in input units, read off the histogram.
+        """
+        edges = np.concatenate(([-Z_RANGE], np.arange(-Z_RANGE, Z_RANGE + BIN_WIDTH / 2, BIN_WIDTH), [Z_RANGE]))
+        lower, upper = edges[:-1], edges[1:]
+        result = np.full((len(qs), self.n_features), np.nan)
+        with self._lock:
+            histogram = self.histogram.copy()
+        totals = histogram.sum(axis=1)
+        cumulative = np.cumsum(histogram, axis=1)
+        for j in range(self.n_features):
+            if not totals[j]:
+                continue
+            for i, q in enumerate(qs):
+                target = q * totals[j]
+                b = min(int(np.searchsorted(cumulative[j], target, side='left')), self.n_bins - 1)
+                before = cumulative[j, b - 1] if b else 0
+                fraction = (target - before) / histogram[j, b] if histogram[j, b] else 0.0
+                z = lower[b] + fraction * (upper[b] - lower[b])
+                result[i, j] = z * self.reference_scale[j] + self.reference_mean[j]
+        return result
+
+    def report(self):
+        """
+        Returns one dict per feature comparing the observed inputs with the training reference.
+        """
+        self.flush()
+        with self._lock:
+            count, mean, variance = self.count, self.mean.copy(), self.variance
+        quantiles = self.quantiles()
+        mean_shift, variance_ratio, drifted = self._drift(count, mean, variance)
+        # None rather than NaN/inf for anything missing, so the report is always valid JSON
+        return [
+            {
+                'feature': name,
+                'count': count,
+                'mean': _number(mean[j]) if count else None,
+                'reference_mean': _number(self.reference_mean[j]),
+                'mean_shift': _number(mean_shift[j]) if count else None,
+                'std': _number(np.sqrt(variance[j])) if count > 1 else None,
+                'reference_std': _number(np.sqrt(self.reference_variance[j])),
+                'variance_ratio': _number(variance_ratio[j]) if count > 1 else None,
+                'p05': _number(quantiles[0, j]) if count else None,
+                'p50': _number(quantiles[1, j]) if count else None,
+                'p95': _number(quantiles[2, j]) if count else None,
+                'drifted': bool(drifted[j]),
+            }
+            for j, name in enumerate(self.feature_names)
+        ]
+
+    # Callers hold self._lock for the helpers below
+
+    def _update(self, X):
+        with np.errstate(all='ignore'):
+            z = (X - self.reference_mean) / self.reference_scale
+            usable = (np.abs(z) <= MAX_Z).all(axis=1)  # False for NaN and inf too
+        if not usable.all():
+            self.skipped += int((~usable).sum())
+            X, z = X[usable], z[usable]
+        if not X.shape[0]:
+            return
+        batch_mean = X.mean(axis=0)
+        self._merge_moments(X.shape[0], batch_mean, ((X - batch_mean) ** 2).sum(axis=0))
+
+        bins = np.clip(np.floor((z + Z_RANGE) / BIN_WIDTH).astype(np.int64) + 1, 0, self.n_bins - 1)
+        bins += np.arange(self.n_features) * self.n_bins
+        self.histogram += np.bincount(bins.ravel(), minlength=self.histogram.size).reshape(self.histogram.shape)
+
+    def _merge_moments(self, count, mean, m2):
+        # Chan et al.: combine two (count, mean, M2) summaries exactly
+        if not count:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean = self.mean + delta * (count / total)
+        self.m2 = self.m2 + m2 + delta ** 2 * (self.count * count / total)
+        self.count = total
+
+    def _drift(self, count, mean, variance):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean_shift = (mean - self.reference_mean) / self.reference_scale
+            variance_ratio = np.where(self.reference_variance > 0, variance / self.reference_variance, np.nan)
+        if count < self.min_count:
+            return mean_shift, variance_ratio, np.zeros(self.n_features, dtype=bool)
+        # NaN ratios (no training variance, or too few rows) compare False either way
+        drifted = (np.abs(mean_shift) > self.mean_threshold) | (variance_ratio > self.variance_ratio) | (
+            variance_ratio < 1.0 / self.variance_ratio)
+        return mean_shift, variance_ratio, drifted
+
+    def _check(self):
+        if self.on_drift is None:
+            return
+        with self._lock:
+            drifted = self._drift(self.count, self.mean, self.variance)[2]
+            new = [name for name, flag in zip(self.feature_names, drifted) if flag and name not in self._flagged]
+            self._flagged = {name for name, flag in zip(self.feature_names, drifted) if flag}
+        # Called outside the lock, so the callback may use the monitor (e.g. report())
+        if new:
+            self.on_drift(new)
+
+
+def _number(value):
+    value = float(value)
+    return value if np.isfinite(value) else None
+
+
+def format_report(report):
+    lines = [f"{'feature':<22} {'count':>8} {'mean':>11} {'train mean':>11} {'shift(sd)':>10} {'var ratio':>10} {'p05':>10} {'p95':>10}"]
+    for entry in report:
+        if entry['count'] == 0:
+            lines.append(f"{entry['feature']:<22} {0:>8}")
+            continue
+        def cell(key, spec):
+            return format(entry[key], spec) if entry[key] is not None else '-'
+
+        lines.append(
+            f"{entry['feature']:<22} {entry['count']:>8} {cell('mean', '.4g'):>11} {cell('reference_mean', '.4g'):>11} "
+            f"{cell('mean_shift', '+.2f'):>10} {cell('variance_ratio', '.2f'):>10} {cell('p05', '.4g'):>10} {cell('p95', '.4g'):>10}"
+            f"{'  DRIFT' if entry['drifted'] else ''}"
+        )
+    return '\n'.join(lines)
+
+
+def monitor_csv(input_path, disease=None, model_dir=MODEL_DIR, chunksize=100_000, **kwargs):
+    """
+    Runs a DriftMonitor over every row of a CSV holding the disease's feature columns.
+
+    Rows with an unparsable cell are skipped and counted like rows with a missing value.
+    """
+    import pandas as pd
+
+    if disease is None:
+        disease = detect_disease(pd.read_csv(input_path, nrows=0).columns)
+        if disease is None:
+            raise ValueError(f"Could not tell which disease {input_path} is for; pass --disease.")
+    features = DISEASES[disease]['feature_columns']
+    monitor = DriftMonitor.from_scorer(load_scorer(disease, model_dir), features, **kwargs)
+    for chunk in pd.read_csv(input_path, usecols=features, chunksize=chunksize):
+        monitor.update(chunk[features].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64))
+    return disease, monitor
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare a CSV of model inputs with the training statistics.")
+    parser.add_argument('input', help="CSV with the disease's feature columns.")
+    parser.add_argument('--disease', choices=sorted(DISEASES), help="Detected from the header when omitted.")
+    parser.add_argument('--model-dir', default=MODEL_DIR)
+    parser.add_argument('--chunksize', type=int, default=100_000)
+    parser.add_argument('--mean-threshold', type=float, default=0.5, help="Mean shift, in training standard deviations, that counts as drift.")
+    parser.add_argument('--variance-ratio', type=float, default=2.0, help="Variance ratio (either way) that counts as drift.")
+    parser.add_argument('--json', help="Also write the report as JSON to this file.")
+    parser.add_argument('--fail-on-drift', action='store_true', help="Exit with status 1 if any feature drifted.")
+    args = parser.parse_args(argv)
+
+    try:
+        disease, monitor = monitor_csv(args.input, args.disease, args.model_dir, args.chunksize,
+                                       mean_threshold=args.mean_threshold, variance_ratio=args.variance_ratio)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Error: {e}")
+        return 2
+
+    report = monitor.report()
+    print(f"{disease}: {monitor.count:,} rows ({monitor.skipped:,} skipped), model {monitor.version[:12]}")
+    print(format_report(report))
+    drifted = [entry['feature'] for entry in report if entry['drifted']]
+    print(f"\n{len(drifted)} of {monitor.n_features} features drifted{': ' + ', '.join(drifted) if drifted else '.'}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'disease': disease, 'model_version': monitor.version, 'features': report}, f, indent=2)
+    return 1 if drifted and args.fail_on_drift else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,291 @@
+import math
+from collections import namedtuple
+
+import numpy as np
+
+# libsvm clamps every pairwise probability into [MIN_PROB, 1 - MIN_PROB]
+MIN_PROB = 1e-7
+
+# Below this many rows the coupling loop runs on Python floats; numpy's
+# per-call overhead would otherwise dominate single-row latency.
+SCALAR_COUPLING_MAX_ROWS = 16
+
+FeatureContribution = namedtuple('FeatureContribution', ['feature', 'value', 'contribution'])
+
+# base_value + sum of contributions + rest == decision; `rest` covers features left out by `top`
+Explanation = namedtuple('Explanation', ['base_value', 'decision', 'probability', 'contributions', 'rest'])
+
+
+class LinearScorer:
+    """
+    Scores rows with a linear SVC and its StandardScaler folded into one weight vector.
+
+    For a linear kernel the decision function on standardized input is
+    ((x - mean) / scale) @ coef + intercept, which is the same as x @ weights + bias
+    with weights = coef / scale and bias = intercept - (mean / scale) @ coef.
+    The Platt sigmoid (A, B) is then applied exactly as libsvm does it, so
+    predict_proba matches SVC.predict_proba without calling into sklearn.
+
+    `version` identifies the model files the scorer was built from (see diseases.load_scorer);
+    caches use it to tell results of different models apart.
+    """
+
+    def __init__(self, mean, scale, coef, intercept, prob_a, prob_b, classes=(0, 1), feature_names=None,
+                 weights=None, bias=None, version=None, var=None):
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.coef = np.asarray(coef, dtype=np.float64).ravel()
+        self.intercept = float(intercept)
+        self.prob_a = float(prob_a)
+        self.prob_b = float(prob_b)
+        self.classes = np.asarray(classes)
+        self.feature_names = list(feature_names) if feature_names is not None else None
+        self.version = version
+        # The scaler's var_, kept for drift monitoring only: scale_ is 1 rather than 0 for a
+        # feature that was constant in training, so scale ** 2 can't stand in for it
+        self.var = np.asarray(var, dtype=np.float64) if var is not None else None
+
+        # --- The fold: scaling + decision function in one dot product ---
+        # Precomputed weights/bias (e.g. memory-mapped from an artifact) are used as-is.
+        if weights is None:
+            self.weights = self.coef / self.scale
+            self.bias = self.intercept - float(np.dot(self.mean / self.scale, self.coef))
+        else:
+            self.weights = np.asarray(weights, dtype=np.float64)
+            self.bias = float(bias)
+
+    @classmethod
+    def from_estimators(cls, model, scaler, version=None):
+        """
+        Builds a scorer from a fitted SVC(kernel='linear', probability=True) and its StandardScaler.
+        """
+        if getattr(model, 'kernel', 'linear') != 'linear':
+            raise ValueError("Only linear-kernel models can be folded into a LinearScorer.")
+        if len(model.classes_) != 2:
+            raise ValueError("Only binary classifiers can be folded into a LinearScorer.")
+
+        n_features = model.coef_.shape[1]
+        mean = scaler.mean_ if getattr(scaler, 'mean_', None) is not None else np.zeros(n_features)
+        scale = scaler.scale_ if getattr(scaler, 'scale_', None) is not None else np.ones(n_features)
+        feature_names = getattr(scaler, 'feature_names_in_', None)
+        var = getattr(scaler, 'var_', None)
+
+        return cls(
+            mean=mean,
+            scale=scale,
+            coef=np.asarray(model.coef_).ravel(),
+            intercept=np.asarray(model.intercept_).ravel()[0],
+            prob_a=np.asarray(model.probA_).ravel()[0],
+            prob_b=np.asarray(model.probB_).ravel()[0],
+            classes=model.classes_,
+            feature_names=feature_names,
+            version=version,
+            var=var,
+        )
+
+    @property
+    def n_features(self):
+        return self.weights.shape[0]
+
+    def _as_matrix(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features per row, got input of shape {X.shape}.")
+        return X
+
+    def decision_function(self, X):
+        """
+        Signed distance to the hyperplane; positive values favour classes[1].
+        """
+        return self._as_matrix(X) @ self.weights + self.bias
+
+    def predict(self, X):
+        return self.classes[(self.decision_function(X) > 0).astype(np.intp)]
+
+    def predict_proba(self, X):
+        """
+        Returns an (N, 2) array of class probabilities ordered like classes.
+        """
+        return self.proba_from_decision(self.decision_function(X))
+
+    # --- Explanations ---
+    # The model is linear in the standardized features, so these are exact, not sampled:
+    # feature j adds (x_j - mean_j) / scale_j * coef_j to the decision function, and the
+    # intercept is the decision value of a row sitting at the training mean.
+
+    def contributions(self, X):
+        """
+        Per-feature contributions to the decision function, shape (N, d); each row sums to decision - intercept.
+        """
+        return (self._as_matrix(X) - self.mean) * self.weights
+
+    def rank_contributions(self, X, top=None):
+        """
+        Returns (indices, contributions), each (N, k), ordered by |contribution|, largest first.
+        """
+        contributions = self.contributions(X)
+        n_features = contributions.shape[1]
+        k = n_features if top is None else max(0, min(top, n_features))
+        magnitude = np.abs(contributions)
+        if k < n_features:
+            candidates = np.argpartition(-magnitude, k - 1, axis=1)[:, :k] if k else np.empty((contributions.shape[0], 0), dtype=np.intp)
+        else:
+            candidates = np.broadcast_to(np.arange(n_features), contributions.shape)
+        ranking = np.argsort(-np.take_along_axis(magnitude, candidates, axis=1), axis=1, kind='stable')
+        order = np.take_along_axis(candidates, ranking, axis=1)
+        return order, np.take_along_axis(contributions, order, axis=1)
+
+    def explain(self, row, top=None, feature_names=None):
+        """
+        Ranked Explanation of a single row's prediction.
+        """
+        X = self._as_matrix(row)
+        if X.shape[0] != 1:
+            raise ValueError("explain() takes a single row; use rank_contributions() for batches.")
+        names = feature_names or self.feature_names or [f'x{i}' for i in range(self.n_features)]
+        order, values = self.rank_contributions(X, top)
+        decision = float(self.decision_function(X)[0])
+        contributions = [
+            FeatureContribution(names[i], float(X[0, i]), value)
+            for i, value in zip(order[0].tolist(), values[0].tolist())
+        ]
+        return Explanation(
+            base_value=self.intercept,
+            decision=decision,
+            probability=float(self.proba_from_decision([decision])[0, 1]),
+            contributions=contributions,
+            rest=decision - self.intercept - sum(c.contribution for c in contributions),
+        )
+
+    def proba_from_decision(self, decision):
+        """
+        Returns an (N, 2) array of class probabilities for decision values.
+
+        Rows with a non-finite decision (e.g. from a missing feature) get NaN
+        probabilities on both the scalar and the vectorized path.
+        """
+        decision = np.asarray(decision, dtype=np.float64).ravel()
+        if decision.shape[0] <= SCALAR_COUPLING_MAX_ROWS:
+            rows = [
+                _pairwise_coupling_scalar(self._sigmoid_scalar(value)) if math.isfinite(value) else (math.nan, math.nan)
+                for value in decision.tolist()
+            ]
+            return np.array(rows, dtype=np.float64).reshape(-1, 2)
+
+        finite = np.isfinite(decision)
+        if finite.all():
+            return self._proba_vectorized(decision)
+        proba = np.full((decision.shape[0], 2), np.nan)
+        proba[finite] = self._proba_vectorized(decision[finite])
+        return proba
+
+    def _proba_vectorized(self, decision):
+        # libsvm's binary decision value has the opposite sign of sklearn's,
+        # and its sigmoid gives the probability of the first class.
+        f_apb = -decision * self.prob_a + self.prob_b
+        r = np.empty_like(f_apb)
+        positive = f_apb >= 0
+        exp_neg = np.exp(-f_apb[positive])
+        r[positive] = exp_neg / (1.0 + exp_neg)
+        r[~positive] = 1.0 / (1.0 + np.exp(f_apb[~positive]))
+        np.clip(r, MIN_PROB, 1.0 - MIN_PROB, out=r)
+
+        p0, p1 = _pairwise_coupling(r)
+        return np.column_stack((p0, p1))
+
+    def _sigmoid_scalar(self, decision):
+        f_apb = -decision * self.prob_a + self.prob_b
+        if f_apb >= 0:
+            r = math.exp(-f_apb) / (1.0 + math.exp(-f_apb))
+        else:
+            r = 1.0 / (1.0 + math.exp(f_apb))
+        return min(max(r, MIN_PROB), 1.0 - MIN_PROB)
+
+
+def _pairwise_coupling_scalar(r):
+    """
+    Single-row version of _pairwise_coupling, returning (p0, p1) as Python floats.
+    """
+    eps = 0.0025
+    q00 = (1.0 - r) ** 2
+    q11 = r ** 2
+    q01 = -(1.0 - r) * r
+    p0 = p1 = 0.5
+    for _ in range(100):
+        qp0 = q00 * p0 + q01 * p1
+        qp1 = q01 * p0 + q11 * p1
+        pqp = p0 * qp0 + p1 * qp1
+        if max(math.fabs(qp0 - pqp), math.fabs(qp1 - pqp)) < eps:
+            break
+
+        diff = (-qp0 + pqp) / q00
+        p0 += diff
+        pqp = (pqp + diff * (diff * q00 + 2 * qp0)) / (1 + diff) / (1 + diff)
+        qp1 = (qp1 + diff * q01) / (1 + diff)
+        p0 /= 1 + diff
+        p1 /= 1 + diff
+
+        diff = (-qp1 + pqp) / q11
+        p1 += diff
+        p0 /= 1 + diff
+        p1 /= 1 + diff
+    return p0, p1
+
+
+def _pairwise_coupling(r):
+    """
+    Vectorized copy of libsvm's multiclass_probability for two classes.
+
+    libsvm does not return the sigmoid output directly even in the binary case; it
+    runs the pairwise-coupling fixed point below and stops at a loose tolerance,
+    so reproducing it is what makes the results agree with predict_proba.
+    """
+    k = 2
+    eps = 0.005 / k
+    max_iter = max(100, k)
+
+    q00 = (1.0 - r) ** 2
+    q11 = r ** 2
+    q01 = -(1.0 - r) * r
+    p0 = np.full_like(r, 1.0 / k)
+    p1 = np.full_like(r, 1.0 / k)
+
+    active = np.arange(r.shape[0])
+    for _ in range(max_iter):
+        a00, a11, a01 = q00[active], q11[active], q01[active]
+        x0, x1 = p0[active], p1[active]
+
+        qp0 = a00 * x0 + a01 * x1
+        qp1 = a01 * x0 + a11 * x1
+        pqp = x0 * qp0 + x1 * qp1
+        max_error = np.maximum(np.abs(qp0 - pqp), np.abs(qp1 - pqp))
+
+        keep = max_error >= eps
+        if not keep.any():
+            break
+        active = active[keep]
+        a00, a11, a01 = a00[keep], a11[keep], a01[keep]
+        x0, x1 = x0[keep], x1[keep]
+        qp0, qp1, pqp = qp0[keep], qp1[keep], pqp[keep]
+
+        # t = 0
+        diff = (-qp0 + pqp) / a00
+        x0 = x0 + diff
+        pqp = (pqp + diff * (diff * a00 + 2 * qp0)) / (1 + diff) / (1 + diff)
+        qp0 = (qp0 + diff * a00) / (1 + diff)
+        qp1 = (qp1 + diff * a01) / (1 + diff)
+        x0 = x0 / (1 + diff)
+        x1 = x1 / (1 + diff)
+
+        # t = 1
+        diff = (-qp1 + pqp) / a11
+        x1 = x1 + diff
+        x0 = x0 / (1 + diff)
+        x1 = x1 / (1 + diff)
+
+        p0[active] = x0
+        p1[active] = x1
+
+    return p0, p1
@@ -0,0 +1,477 @@
+"""
+Low-overhead instrumentation for the prediction path, exported in Prometheus text format.
+
+Typical use around one prediction:
+
+    timer = metrics.start('heart')
+    ...parse the input...;            timer.mark('parse')
+    ...scaled decision function...;   timer.mark('scale_decision')
+    ...probability...;                timer.mark('probability')
+    ...render the result...;          timer.mark('render')
+    timer.finish(cache_hit=False)
+
+Each mark costs one perf_counter_ns call and a list extend; finish() is a single
+deque append. Stage durations and histogram bucketing are never worked out on the
+request path: a background thread flushes the deque every `flush_interval` seconds,
+and rendering the metrics flushes whatever is left. measure_overhead() reports the
+request-path cost per prediction for the stages the app marks, and
+measure_flush_cost() the background work of one flush.
+Since the scaler is folded into the model weights (see LinearScorer), scaling and
+the decision function are one dot product and are timed as one 'scale_decision' stage.
+
+Metrics are exposed with start_http_server(port) (GET /metrics) or written to a
+file with write_textfile(path) / start_textfile_writer(path, interval), e.g. for
+node_exporter's textfile collector.
+"""
+import os
+import sys
+import threading
+import time
+import traceback
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from operator import sub
+
+# Histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (
+    1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+    1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5,
+)
+BATCH_SIZE_BUCKETS = (1, 4, 16, 64, 256, 1024)
+
+_now = time.perf_counter_ns
+
+# Stages app.py's show_prediction marks on a cache miss; serve.py marks a similar number
+PREDICTION_STAGES = ('parse', 'drift', 'cache', 'scale_decision', 'probability', 'render', 'explain')
+
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram; observations are integer nanoseconds.
+    """
+
+    __slots__ = ('bounds_ns', 'counts', 'sum_ns', 'count')
+
+    def __init__(self, buckets=LATENCY_BUCKETS, unit=1e9):
+        self.bounds_ns = [int(bound * unit) for bound in buckets]
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum_ns = 0
+        self.count = 0
+
+    def observe(self, value_ns):
+        self.counts[bisect_left(self.bounds_ns, value_ns)] += 1
+        self.sum_ns += value_ns
+        self.count += 1
+
+    def observe_many(self, values_ns):
+        """
+        Same as observe() for each value; one sort and a bisect per bucket instead of per value.
+        """
+        values_ns = sorted(values_ns)
+        lo = 0
+        for i, bound in enumerate(self.bounds_ns):
+            hi = bisect_right(values_ns, bound, lo)
+            self.counts[i] += hi - lo
+            lo = hi
+        self.counts[-1] += len(values_ns) - lo
+        self.sum_ns += sum(values_ns)
+        self.count += len(values_ns)
+
+
+class PredictionTimer:
+    """
+    Times the stages of one prediction; created by Metrics.start().
+    """
+
+    __slots__ = ('_metrics', '_disease', '_marks')
+
+    def __init__(self, metrics, disease):
+        self._metrics = metrics
+        self._disease = disease
+        # Flat [start, stage, timestamp, stage, timestamp, ...]: one list per prediction
+        # instead of a tuple per mark keeps allocations (and cyclic GC passes) down
+        self._marks = [_now()]
+
+    def mark(self, stage):
+        """
+        Closes the stage that started at the previous mark (or at start()).
+        """
+        # Only the timestamp is taken here; durations are computed when metrics are flushed
+        self._marks += (stage, _now())
+
+    def finish(self, cache_hit=False, error=False):
+        self._metrics._record(self, cache_hit, error)
+
+    def stages(self):
+        """
+        Returns [(stage, nanoseconds), ...] for the marks so far.
+        """
+        marks = self._marks
+        return list(zip(marks[1::2], map(sub, marks[2::2], marks[0::2])))
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def mark(self, stage):
+        pass
+
+    def finish(self, cache_hit=False, error=False):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Metrics:
+    """
+    Per-disease prediction counters and stage/total latency histograms.
+
+    Finished timings are appended to a deque (atomic, no lock) and only bucketed into
+    histograms by a background thread every `flush_interval` seconds, or when metrics
+    are rendered, which keeps the per-prediction cost to a handful of attribute
+    operations. The deque holds at most `max_pending` timings; if the flusher falls
+    behind, further timings are dropped and counted in `dropped` rather than growing
+    memory or pausing a request. Pass flush_interval=None to flush only when rendering.
+
+    `slow_threshold` (seconds) enables the slow-request hook: `on_slow(disease, seconds, stages)`
+    is called for every prediction slower than that. An attached SlowRequestProfiler
+    additionally samples the stacks of slow requests while they are still running.
+    """
+
+    def __init__(self, enabled=True, namespace='health', slow_threshold=None, on_slow=None, max_pending=65536, flush_interval=1.0):
+        self.enabled = enabled
+        self.namespace = namespace
+        self.slow_threshold_ns = int(slow_threshold * 1e9) if slow_threshold else None
+        self.on_slow = on_slow
+        self.max_pending = max_pending
+        self.profiler = None
+        self.dropped = 0
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._predictions = defaultdict(int)
+        self._errors = defaultdict(int)
+        self._stage_histograms = {}
+        self._total_histograms = {}
+        self._batch_sizes = {}
+        self._batches = defaultdict(int)
+        self._stop = threading.Event()
+        self._flusher = None
+        if enabled and flush_interval:
+            self._flusher = threading.Thread(target=self._run_flusher, args=(flush_interval,), name='metrics-flush', daemon=True)
+            self._flusher.start()
+
+    def stop(self):
+        """
+        Stops the background flusher; pending timings are still flushed when rendering.
+        """
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join()
+
+    def _run_flusher(self, interval):
+        while not self._stop.wait(interval):
+            self.flush()
+
+    def start(self, disease):
+        if not self.enabled:
+            return _NULL_TIMER
+        timer = PredictionTimer(self, disease)
+        if self.profiler is not None:
+            self.profiler.begin(timer, disease)
+        return timer
+
+    def observe_stage(self, disease, stage, value_ns):
+        """
+        Records one stage timing outside a PredictionTimer (e.g. once per micro-batch).
+        """
+        if not self.enabled:
+            return
+        if len(self._pending) < self.max_pending:
+            self._pending.append((disease, [0, stage, value_ns], None))
+        else:
+            self._drop()
+
+    def observe_batch(self, disease, size):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._batches[disease] += 1
+            sizes = self._batch_sizes.get(disease)
+            if sizes is None:
+                sizes = self._batch_sizes[disease] = Histogram(BATCH_SIZE_BUCKETS, unit=1)
+            sizes.observe(size)
+
+    def _record(self, timer, cache_hit, error):
+        pending = self._pending
+        if len(pending) < self.max_pending:
+            pending.append((timer._disease, timer._marks, 'error' if error else 'hit' if cache_hit else 'miss'))
+        else:
+            self._drop()
+        if self.profiler is not None:
+            self.profiler.end(timer)
+        if self.slow_threshold_ns is not None and self.on_slow:
+            total_ns = timer._marks[-1] - timer._marks[0]
+            if total_ns > self.slow_threshold_ns:
+                self.on_slow(timer._disease, total_ns / 1e9, [(stage, value_ns / 1e9) for stage, value_ns in timer.stages()])
+
+    def _drop(self):
+        with self._lock:
+            self.dropped += 1
+
+    def flush(self):
+        """
+        Moves pending timings into the counters and histograms.
+        """
+        pending = self._pending
+        # Predictions that marked the same stages share a group, whose timestamps are
+        # then differenced a column at a time instead of a mark at a time
+        groups = {}  # (disease, stages, outcome) -> [[start, timestamp, ...], ...]
+        with self._lock:
+            while True:
+                try:
+                    disease, marks, outcome = pending.popleft()
+                except IndexError:
+                    break
+                key = (disease, tuple(marks[1::2]), outcome)
+                rows = groups.get(key)
+                if rows is None:
+                    rows = groups[key] = []
+                rows.append(marks[0::2])
+
+            for (disease, stages, outcome), rows in groups.items():
+                columns = list(zip(*rows))
+                for stage, before, after in zip(stages, columns, columns[1:]):
+                    histogram = self._stage_histograms.get((disease, stage))
+                    if histogram is None:
+                        histogram = self._stage_histograms[(disease, stage)] = Histogram()
+                    histogram.observe_many(map(sub, after, before))
+                if outcome is None:  # bare stages from observe_stage()
+                    continue
+                if outcome == 'error':
+                    self._errors[disease] += len(rows)
+                    continue
+                self._predictions[(disease, outcome)] += len(rows)
+                histogram = self._total_histograms.get(disease)
+                if histogram is None:
+                    histogram = self._total_histograms[disease] = Histogram()
+                histogram.observe_many(map(sub, columns[-1], columns[0]))
+
+    def render_prometheus(self):
+        """
+        Returns all metrics in the Prometheus text exposition format (version 0.0.4).
+        """
+        self.flush()
+        ns = self.namespace
+        lines = []
+        with self._lock:
+            lines.append(f'# HELP {ns}_predictions_total Predictions served, by disease and cache result.')
+            lines.append(f'# TYPE {ns}_predictions_total counter')
+            for (disease, cache), value in sorted(self._predictions.items()):
+                lines.append(f'{ns}_predictions_total{{disease="{disease}",cache="{cache}"}} {value}')
+
+            lines.append(f'# HELP {ns}_prediction_errors_total Predictions that failed, by disease.')
+            lines.append(f'# TYPE {ns}_prediction_errors_total counter')
+            for disease, value in sorted(self._errors.items()):
+                lines.append(f'{ns}_prediction_errors_total{{disease="{disease}"}} {value}')
+
+            lines.append(f'# HELP {ns}_metrics_dropped_timings_total Timings dropped because the flusher fell behind.')
+            lines.append(f'# TYPE {ns}_metrics_dropped_timings_total counter')
+            lines.append(f'{ns}_metrics_dropped_timings_total {self.dropped}')
+
+            lines.append(f'# HELP {ns}_prediction_seconds End-to-end prediction latency.')
+            lines.append(f'# TYPE {ns}_prediction_seconds histogram')
+            for disease, histogram in sorted(self._total_histograms.items()):
+                lines.extend(_histogram_lines(f'{ns}_prediction_seconds', f'disease="{disease}"', histogram, LATENCY_BUCKETS))
+
+            lines.append(f'# HELP {ns}_prediction_stage_seconds Latency of each prediction stage.')
+            lines.append(f'# TYPE {ns}_prediction_stage_seconds histogram')
+            for (disease, stage), histogram in sorted(self._stage_histograms.items()):
+                labels = f'disease="{disease}",stage="{stage}"'
+                lines.extend(_histogram_lines(f'{ns}_prediction_stage_seconds', labels, histogram, LATENCY_BUCKETS))
+
+            if self._batches:
+                lines.append(f'# HELP {ns}_batches_total Micro-batches scored, by disease.')
+                lines.append(f'# TYPE {ns}_batches_total counter')
+                for disease, value in sorted(self._batches.items()):
+                    lines.append(f'{ns}_batches_total{{disease="{disease}"}} {value}')
+                lines.append(f'# HELP {ns}_batch_size Rows per micro-batch.')
+                lines.append(f'# TYPE {ns}_batch_size histogram')
+                for disease, histogram in sorted(self._batch_sizes.items()):
+                    lines.extend(_histogram_lines(f'{ns}_batch_size', f'disease="{disease}"', histogram, BATCH_SIZE_BUCKETS, scale=1))
+        return '\n'.join(lines) + '\n'
+
+
+def _histogram_lines(name, labels, histogram, buckets, scale=1e9):
+    lines = []
+    cumulative = 0
+    for bound, count in zip(buckets, histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+    lines.append(f'{name}_sum{{{labels}}} {histogram.sum_ns / scale:.9g}')
+    lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+    return lines
+
+
+# --- EXPORT ---
+
+def start_http_server(metrics, port, host='127.0.0.1'):
+    """
+    Serves GET /metrics from a daemon thread and returns the server.
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = metrics.render_prometheus().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+    return server
+
+
+def write_textfile(metrics, path):
+    """
+    Atomically writes the current metrics to `path`.
+    """
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(metrics.render_prometheus())
+    os.replace(tmp_path, path)
+
+
+def start_textfile_writer(metrics, path, interval=15.0):
+    def loop():
+        while True:
+            write_textfile(metrics, path)
+            time.sleep(interval)
+
+    thread = threading.Thread(target=loop, name='metrics-textfile', daemon=True)
+    thread.start()
+    return thread
+
+
+# --- SLOW-REQUEST PROFILER ---
+
+class SlowRequestProfiler:
+    """
+    Sampling profiler for predictions that run longer than `threshold` seconds.
+
+    While attached, a daemon thread wakes every `interval` seconds and, for each
+    in-flight prediction older than the threshold, records the stack of the thread
+    running it. Stacks are aggregated and can be dumped in the collapsed format
+    flamegraph.pl and speedscope read. Fast requests are never sampled, so the cost
+    on the common path is two dict operations per prediction.
+    """
+
+    def __init__(self, metrics, threshold=0.05, interval=0.005, max_depth=40):
+        self.threshold_ns = int(threshold * 1e9)
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples = Counter()
+        self._active = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        metrics.profiler = self
+        self._thread = threading.Thread(target=self._run, name='slow-request-profiler', daemon=True)
+        self._thread.start()
+
+    def begin(self, timer, disease):
+        self._active[timer] = (threading.get_ident(), disease, time.perf_counter_ns())
+
+    def end(self, timer):
+        self._active.pop(timer, None)
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter_ns()
+            slow = [(ident, disease) for ident, disease, started in list(self._active.values()) if now - started > self.threshold_ns]
+            if not slow:
+                continue
+            frames = sys._current_frames()
+            with self._lock:
+                for ident, disease in slow:
+                    frame = frames.get(ident)
+                    if frame is None:
+                        continue
+                    stack = traceback.extract_stack(frame, limit=self.max_depth)
+                    key = (disease,) + tuple(f'{entry.name} ({os.path.basename(entry.filename)}:{entry.lineno})' for entry in stack)
+                    self.samples[key] += 1
+
+    def collapsed(self):
+        """
+        Returns the samples as 'disease;frame;frame;... count' lines, hottest first.
+        """
+        with self._lock:
+            return '\n'.join(f"{';'.join(stack)} {count}" for stack, count in self.samples.most_common())
+
+    def dump(self, path):
+        with open(path, 'w') as f:
+            f.write(self.collapsed() + '\n')
+
+
+def measure_overhead(n=100_000, stages=PREDICTION_STAGES, chunk=4096):
+    """
+    Returns the instrumentation cost per prediction in microseconds (enabled minus disabled).
+
+    This is the request-path cost only. Bucketing happens off the request path and is
+    measured by measure_flush_cost(); here the pending timings are flushed between
+    untimed chunks of `chunk` predictions, as the background flusher would, so that
+    the timed loop neither shares the GIL with a flush nor drags an unrealistically
+    long backlog through the garbage collector.
+    """
+    def run(metrics):
+        elapsed = 0
+        for _ in range(n // chunk):
+            start = time.perf_counter_ns()
+            for _ in range(chunk):
+                timer = metrics.start('benchmark')
+                for stage in stages:
+                    timer.mark(stage)
+                timer.finish()
+            elapsed += time.perf_counter_ns() - start
+            metrics.flush()
+        return elapsed / (n // chunk * chunk)
+
+    enabled = run(Metrics(enabled=True, max_pending=chunk, flush_interval=None))
+    disabled = run(Metrics(enabled=False))
+    return (enabled - disabled) / 1000.0
+
+
+def measure_flush_cost(n=4096, stages=PREDICTION_STAGES, repeat=5):
+    """
+    Returns the median time in milliseconds the background flusher spends bucketing
+    `n` pending timings.
+    """
+    pauses = []
+    for _ in range(repeat):
+        metrics = Metrics(max_pending=n, flush_interval=None)
+        for _ in range(n):
+            timer = metrics.start('benchmark')
+            for stage in stages:
+                timer.mark(stage)
+            timer.finish()
+        start = time.perf_counter_ns()
+        metrics.flush()
+        pauses.append(time.perf_counter_ns() - start)
+    return sorted(pauses)[len(pauses) // 2] / 1e6
+
+
+if __name__ == "__main__":
+    print(f"Instrumentation overhead: {measure_overhead():.2f} us per prediction ({len(PREDICTION_STAGES)} stages)")
+    print(f"Background flush: {measure_flush_cost():.2f} ms per 4096 predictions")
@@ -0,0 +1,118 @@
+import threading
+import time
+from collections import namedtuple
+
+from diseases import MODEL_DIR, load_scorer, model_signature
+
+ModelEntry = namedtuple('ModelEntry', ['scorer', 'version', 'signature', 'loaded_at', 'load_seconds'])
+
+
+class ModelRegistry:
+    """
+    Holds the active model per disease and hot-swaps it when train.py writes new files.
+
+    Models are loaded lazily on first `get`. Once `start()` is called, a daemon thread
+    stats the model files every `poll_interval` seconds. When a disease's files change
+    and then stay unchanged for one more poll (so a half-written pair of pickles is
+    never read), the new model is loaded in that thread and swapped in with a single
+    reference assignment. Callers that already hold the old scorer finish with it;
+    the next `get` returns the new one. If the new files fail to load, the old model
+    keeps serving and the load is retried on the next change.
+    """
+
+    def __init__(self, model_dir=MODEL_DIR, poll_interval=5.0, loader=load_scorer):
+        self.model_dir = model_dir
+        self.poll_interval = poll_interval
+        self._loader = loader
+        self._entries = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.reloads = 0
+        self.failed_reloads = 0
+
+    def get(self, disease):
+        """
+        Returns the active LinearScorer for `disease`; raises FileNotFoundError if it was never trained.
+        """
+        return self.entry(disease).scorer
+
+    def entry(self, disease):
+        entry = self._entries.get(disease)
+        if entry is not None:
+            return entry
+        with self._lock:
+            # Another thread may have finished the first load while this one waited
+            entry = self._entries.get(disease)
+            if entry is None:
+                entry = self._load(disease)
+                self._entries[disease] = entry
+            return entry
+
+    def version(self, disease):
+        """
+        Returns the version of the model currently serving `disease`, or None if it isn't loaded.
+        """
+        entry = self._entries.get(disease)
+        return entry.version if entry else None
+
+    def versions(self):
+        return {disease: entry.version for disease, entry in self._entries.items()}
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name='model-registry', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def check_for_updates(self):
+        """
+        Runs one poll: reloads every loaded disease whose files changed and then settled.
+        """
+        for disease, entry in list(self._entries.items()):
+            signature = model_signature(disease, self.model_dir)
+            if signature == entry.signature:
+                self._pending.pop(disease, None)
+                continue
+            if self._pending.get(disease) != signature:
+                # First sighting of this change; wait one poll for the writer to finish
+                self._pending[disease] = signature
+                continue
+
+            self._pending.pop(disease, None)
+            try:
+                new_entry = self._load(disease)
+            except Exception as e:
+                self.failed_reloads += 1
+                print(f"Warning: could not reload the {disease} model, still serving {entry.version[:12]}: {e}")
+                # Remember the broken files so they are only retried once they change again
+                with self._lock:
+                    self._entries[disease] = entry._replace(signature=signature)
+                continue
+
+            with self._lock:
+                self._entries[disease] = new_entry
+            if new_entry.version != entry.version:
+                self.reloads += 1
+                print(f"Reloaded {disease} model: {entry.version[:12]} -> {new_entry.version[:12]}")
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.check_for_updates()
+            except Exception as e:
+                print(f"Warning: model registry poll failed: {e}")
+
+    def _load(self, disease):
+        signature = model_signature(disease, self.model_dir)
+        start = time.perf_counter()
+        scorer = self._loader(disease, self.model_dir)
+        load_seconds = time.perf_counter() - start
+        return ModelEntry(scorer, scorer.version, signature, time.time(), load_seconds)
@@ -0,0 +1,112 @@
+import math
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+# Rough per-entry bookkeeping cost (OrderedDict node, tuple key, float value, expiry)
+ENTRY_OVERHEAD_BYTES = 200
+
+
+class PredictionCache:
+    """
+    Bounded, thread-safe cache of predicted probabilities.
+
+    Keys are (disease, model version, canonicalised feature vector). Features are
+    rounded to `significant_digits` relative to their own magnitude, so re-submitted
+    forms and retries hit even when they differ in float noise, while features on tiny
+    scales (parkinsons' MDVP:Jitter(Abs) is ~4e-5) keep all their meaningful digits.
+    Non-finite probabilities are never stored. Entries are evicted least-recently-used
+    once `max_entries` or `max_bytes` is exceeded, and expire `ttl` seconds after they
+    were stored.
+    Because the model version is part of the key, a replaced model's results are never
+    served for its successor; its entries are simply no longer hit and age out through
+    LRU eviction and the TTL. Callers can therefore get/put with whichever version
+    actually scored a row, even one hot-swapped out meanwhile, without disturbing the
+    new model's entries.
+
+    One instance is meant to be shared by every session/request in a process.
+    """
+
+    def __init__(self, max_entries=100_000, max_bytes=64 * 1024 * 1024, ttl=3600.0, significant_digits=9, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.significant_digits = significant_digits
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def canonical(self, row):
+        """
+        Returns the byte string a feature vector is keyed on.
+        """
+        # Round the binary mantissa (in [0.5, 1)) rather than the value: it can't overflow
+        # to inf for huge inputs, and the precision kept is relative to each feature's scale
+        mantissa, exponent = np.frexp(np.asarray(row, dtype=np.float64).ravel())
+        mantissa = np.round(mantissa, self.significant_digits)
+        # Adding 0.0 folds -0.0 into 0.0 so both spellings share a key
+        return (mantissa + 0.0).tobytes() + exponent.tobytes()
+
+    def get(self, disease, version, row):
+        """
+        Returns the cached probability for `row`, or None on a miss.
+        """
+        key = (disease, version, self.canonical(row))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= self._clock():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, disease, version, row, value):
+        if not math.isfinite(value):
+            return
+        key = (disease, version, self.canonical(row))
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, self._clock() + self.ttl)
+            self._bytes += self._entry_size(key)
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+    # Callers hold self._lock for the helpers below
+
+    def _remove(self, key):
+        del self._entries[key]
+        self._bytes -= self._entry_size(key)
+
+    def _entry_size(self, key):
+        return ENTRY_OVERHEAD_BYTES + sys.getsizeof(key[2])
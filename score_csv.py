@@ -0,0 +1,228 @@
+"""
+Bulk-scores a CSV of patient rows with one of the trained models.
+
+The input is read in fixed-size blocks of lines; each block is parsed, scored as
+one vectorized batch and formatted back to CSV by a worker process, and the
+results are written in input order. At most a few blocks are in flight at any
+time, so memory stays constant no matter how large the file is.
+
+Example:
+    python score_csv.py extract.csv scored.csv --chunksize 200000 --workers 8
+
+Rows must not contain quoted fields with embedded newlines, since blocks are cut
+on line boundaries before parsing.
+
+Rows with a missing, unparsable (e.g. 'abc') or non-finite feature value are not
+scored: they are written with an empty probability and prediction (or abort the run
+with --on-missing error) and counted in the summary.
+
+With --drift-report, each worker also summarises its blocks' feature statistics;
+they are merged into one DriftMonitor report (see drift_monitor.py) at the end.
+"""
+import argparse
+import csv
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from diseases import DISEASES, MODEL_DIR, detect_disease, load_scorer
+from drift_monitor import DriftMonitor, format_report
+
+# Per-process state set up once by _init_worker
+_worker_state = {}
+
+
+def _init_worker(disease, model_dir, header, id_column, track_drift=False, on_missing='skip'):
+    spec = DISEASES[disease]
+    _worker_state['scorer'] = load_scorer(disease, model_dir)
+    _worker_state['features'] = spec['feature_columns']
+    _worker_state['header'] = header
+    _worker_state['id_column'] = id_column
+    _worker_state['track_drift'] = track_drift
+    _worker_state['on_missing'] = on_missing
+
+
+def _score_block(text, first_line=2):
+    """
+    Parses one block of CSV lines, scores it and returns (row_count, missing_count, csv_text, drift_summary).
+
+    `first_line` is the file line number of the block's first row, for error messages.
+    """
+    state = _worker_state
+    chunk = pd.read_csv(io.StringIO(text), names=state['header'], header=None)
+    # Unparsable cells become NaN, so one bad value costs its row rather than the whole run
+    X = chunk[state['features']].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64)
+
+    # Rows with a blank, unparsable or non-finite feature get no score rather than a made-up one
+    missing = ~np.isfinite(X).all(axis=1)
+    missing_count = int(missing.sum())
+    if missing_count and state['on_missing'] == 'error':
+        line = first_line + int(np.argmax(missing))
+        raise ValueError(f"Line {line} has a missing, unparsable or non-finite feature value.")
+    if missing_count:
+        probabilities = np.full(X.shape[0], np.nan)
+        probabilities[~missing] = state['scorer'].predict_proba(X[~missing])[:, 1]
+        predictions = pd.array((probabilities >= 0.5).astype(np.int8), dtype='Int8')
+        predictions[missing] = pd.NA
+    else:
+        probabilities = state['scorer'].predict_proba(X)[:, 1]
+        predictions = (probabilities >= 0.5).astype(np.int8)
+
+    out = pd.DataFrame({'probability': probabilities, 'prediction': predictions})
+    if state['id_column']:
+        out.insert(0, state['id_column'], chunk[state['id_column']].to_numpy())
+
+    drift_summary = None
+    if state['track_drift']:
+        monitor = DriftMonitor.from_scorer(state['scorer'])
+        monitor.update(X)
+        drift_summary = monitor.summary()
+    return len(chunk), missing_count, out.to_csv(header=False, index=False, float_format='%.6f'), drift_summary
+
+
+def _read_blocks(handle, chunksize, first_line=2):
+    """
+    Yields (text, first_line) for consecutive blocks of at most `chunksize` lines.
+    """
+    lines = []
+    for line in handle:
+        lines.append(line)
+        if len(lines) == chunksize:
+            yield ''.join(lines), first_line
+            first_line += len(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines), first_line
+
+
+def score_csv(input_path, output_path, disease=None, chunksize=100_000, workers=1, id_column=None,
+              model_dir=MODEL_DIR, progress=True, drift_report=None, on_missing='skip'):
+    """
+    Streams `input_path` through the disease model and writes probabilities to `output_path`.
+
+    Returns a dict with the disease used, the number of rows, the number of rows left
+    unscored because of missing feature values and rows/second; with `drift_report`
+    (a JSON path) also the features whose inputs drifted from training.
+    on_missing='error' raises ValueError at the first row with a missing feature value instead.
+    """
+    if on_missing not in ('skip', 'error'):
+        raise ValueError(f"on_missing must be 'skip' or 'error', not {on_missing!r}.")
+    with open(input_path, newline='') as handle:
+        header = next(csv.reader([handle.readline()]))
+
+        if disease is None:
+            disease = detect_disease(header)
+            if disease is None:
+                raise ValueError(f"{input_path} does not contain the feature columns of any known disease.")
+        missing = [column for column in DISEASES[disease]['feature_columns'] if column not in header]
+        if missing:
+            raise ValueError(f"{input_path} is missing {disease} feature columns: {missing}")
+        if id_column and id_column not in header:
+            raise ValueError(f"Id column '{id_column}' not found in {input_path}.")
+
+        init_args = (disease, model_dir, header, id_column, drift_report is not None, on_missing)
+        monitor = None
+        if drift_report is not None:
+            monitor = DriftMonitor.from_scorer(load_scorer(disease, model_dir), DISEASES[disease]['feature_columns'])
+        start = time.perf_counter()
+        rows = missing_rows = 0
+
+        with open(output_path, 'w', newline='') as out:
+            out.write(','.join(([id_column] if id_column else []) + ['probability', 'prediction']) + '\n')
+
+            def consume(result):
+                nonlocal rows, missing_rows
+                count, missing_count, text, drift_summary = result
+                out.write(text)
+                rows += count
+                missing_rows += missing_count
+                if monitor is not None:
+                    monitor.merge_summary(drift_summary)
+                if progress:
+                    _report(rows, start)
+
+            if workers <= 1:
+                _init_worker(*init_args)
+                for block in _read_blocks(handle, chunksize):
+                    consume(_score_block(*block))
+            else:
+                # Bounded submission window: Pool.imap would read the whole input ahead
+                with multiprocessing.Pool(workers, initializer=_init_worker, initargs=init_args) as pool:
+                    pending = deque()
+                    for block in _read_blocks(handle, chunksize):
+                        pending.append(pool.apply_async(_score_block, block))
+                        if len(pending) >= 2 * workers:
+                            consume(pending.popleft().get())
+                    while pending:
+                        consume(pending.popleft().get())
+
+    elapsed = time.perf_counter() - start
+    rate = rows / elapsed if elapsed > 0 else float('inf')
+    if progress:
+        print(f"\nScored {rows:,} {disease} rows in {elapsed:.2f}s ({rate:,.0f} rows/s)", file=sys.stderr)
+        if missing_rows:
+            print(f"{missing_rows:,} rows had missing feature values and were left unscored", file=sys.stderr)
+    result = {'disease': disease, 'rows': rows, 'missing_rows': missing_rows, 'seconds': elapsed, 'rows_per_second': rate}
+
+    if monitor is not None:
+        report = monitor.report()
+        with open(drift_report, 'w') as f:
+            json.dump({'disease': disease, 'model_version': monitor.version, 'features': report}, f, indent=2)
+        result['drifted_features'] = [entry['feature'] for entry in report if entry['drifted']]
+        if progress:
+            print(format_report(report), file=sys.stderr)
+            print(f"Drift report written to {drift_report}", file=sys.stderr)
+    return result
+
+
+def _report(rows, start):
+    elapsed = time.perf_counter() - start
+    rate = rows / elapsed if elapsed > 0 else 0.0
+    print(f"\r{rows:,} rows scored ({rate:,.0f} rows/s)", end='', file=sys.stderr, flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-score a CSV file with a trained health model.")
+    parser.add_argument('input', help="CSV file with one patient per row and a header line.")
+    parser.add_argument('output', help="Where to write the probabilities.")
+    parser.add_argument('--disease', choices=sorted(DISEASES), help="Model to use; detected from the columns if omitted.")
+    parser.add_argument('--chunksize', type=int, default=100_000, help="Rows per scored block (default: 100000).")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Worker processes (default: all cores).")
+    parser.add_argument('--id-column', help="Input column to copy into the output next to each probability.")
+    parser.add_argument('--model-dir', default=MODEL_DIR, help="Directory holding the trained models.")
+    parser.add_argument('--quiet', action='store_true', help="Don't print progress to stderr.")
+    parser.add_argument('--drift-report', help="Also compare the inputs with the training statistics and write a JSON report here.")
+    parser.add_argument('--on-missing', choices=['skip', 'error'], default='skip',
+                        help="Rows with missing feature values: leave them unscored (default) or stop with an error.")
+    args = parser.parse_args(argv)
+
+    if args.chunksize < 1:
+        parser.error("--chunksize must be at least 1")
+
+    try:
+        score_csv(
+            args.input, args.output,
+            disease=args.disease,
+            chunksize=args.chunksize,
+            workers=args.workers,
+            id_column=args.id_column,
+            model_dir=args.model_dir,
+            progress=not args.quiet,
+            drift_report=args.drift_report,
+            on_missing=args.on_missing,
+        )
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,407 @@
+"""
+Headless HTTP inference service for the three health models.
+
+Endpoints:
+    POST /predict/{diabetes,heart,parkinsons}   body: {"features": [...]} or {"features": {"column": value, ...}}
+                     add "explain": k (or true for all features) for the k largest per-feature contributions
+    GET  /health
+    GET  /stats
+    GET  /metrics    Prometheus text format: per-disease counters and per-stage latency histograms
+    GET  /drift      per-feature input statistics compared with each model's training data
+
+Concurrent requests for the same disease are gathered into micro-batches (bounded
+by --max-batch-size and --max-wait-ms) and scored with one vectorized call.
+
+Example:
+    python serve.py --port 8000 --max-batch-size 256 --max-wait-ms 2
+"""
+import argparse
+import asyncio
+import json
+import math
+import time
+
+import numpy as np
+
+from diseases import DISEASES, MODEL_DIR
+from drift_monitor import DriftMonitor
+from metrics import Metrics
+from model_registry import ModelRegistry
+from prediction_cache import PredictionCache
+
+MAX_BODY_BYTES = 1 << 20
+
+
+class MicroBatcher:
+    """
+    Collects single-row requests and scores them together.
+
+    The first request of a batch starts a `max_wait` window; the batch is flushed
+    when the window closes or `max_batch_size` rows are waiting, whichever comes first.
+    `get_scorer` is called once per batch, so a hot-swapped model is picked up by the
+    next batch while the current one finishes on the model it started with.
+    """
+
+    def __init__(self, get_scorer, max_batch_size=256, max_wait=0.002, disease=None, metrics=None):
+        self.get_scorer = get_scorer
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.disease = disease
+        self.metrics = metrics if metrics is not None else Metrics(enabled=False)
+        self.queue = asyncio.Queue()
+        self.batches = 0
+        self.rows = 0
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, row):
+        """
+        Resolves to (probability, scorer) for one row, `scorer` being the model that scored it.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((row, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                # Drain whatever is already queued before waiting on the clock
+                if not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            self._score(batch)
+
+    def _score(self, batch):
+        rows = np.array([row for row, _ in batch], dtype=np.float64)
+        try:
+            scorer = self.get_scorer()
+            start = time.perf_counter_ns()
+            decision = scorer.decision_function(rows)
+            scored = time.perf_counter_ns()
+            probabilities = scorer.proba_from_decision(decision)[:, 1]
+            self.metrics.observe_stage(self.disease, 'batch_scale_decision', scored - start)
+            self.metrics.observe_stage(self.disease, 'batch_probability', time.perf_counter_ns() - scored)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.rows += len(batch)
+        self.metrics.observe_batch(self.disease, len(batch))
+        for (_, future), probability in zip(batch, probabilities.tolist()):
+            if not future.done():
+                future.set_result((probability, scorer))
+
+
+class InferenceServer:
+    """
+    Minimal HTTP/1.1 server (keep-alive, JSON bodies) on top of asyncio streams.
+    """
+
+    def __init__(self, registry, diseases, max_batch_size=256, max_wait=0.002, cache=None, metrics=None):
+        self.registry = registry
+        self.metrics = metrics if metrics is not None else Metrics(enabled=False)
+        self.batchers = {
+            name: MicroBatcher(lambda name=name: registry.get(name), max_batch_size, max_wait, name, self.metrics)
+            for name in diseases
+        }
+        self.cache = cache
+        self.drift = {}
+        self.started = time.monotonic()
+        self.requests = 0
+
+    async def serve(self, host, port):
+        for batcher in self.batchers.values():
+            batcher.start()
+        server = await asyncio.start_server(self._handle_connection, host, port, backlog=4096)
+        print(f"Serving {', '.join(sorted(self.batchers))} on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._respond(writer, 400, {'error': 'Malformed request line.'}, keep_alive=False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get('content-length', 0) or 0)
+                    if length < 0:
+                        raise ValueError(length)
+                except ValueError:
+                    await self._respond(writer, 400, {'error': 'Invalid Content-Length header.'}, keep_alive=False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {'error': 'Request body too large.'}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                try:
+                    status, payload = await self._dispatch(method, path, body)
+                except Exception as e:
+                    # e.g. the model failed to score the batch; answer instead of dropping the connection
+                    print(f"Error handling {method} {path}: {e!r}")
+                    status, payload = 500, {'error': 'Internal server error.'}
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, path, body):
+        if method == 'GET' and path == '/health':
+            return 200, {'status': 'ok'}
+        if method == 'GET' and path == '/stats':
+            return 200, self.stats()
+        if method == 'GET' and path == '/metrics':
+            return 200, self.metrics.render_prometheus()
+        if method == 'GET' and path == '/drift':
+            return 200, {disease: monitor.report() for disease, monitor in self.drift.items()}
+
+        prefix = '/predict/'
+        if not path.startswith(prefix):
+            return 404, {'error': f'Unknown path {path}.'}
+        disease = path[len(prefix):]
+        if disease not in self.batchers:
+            return 404, {'error': f'Unknown disease {disease!r}; expected one of {sorted(self.batchers)}.'}
+        if method != 'POST':
+            return 405, {'error': 'Use POST for predictions.'}
+
+        timer = self.metrics.start(disease)
+        try:
+            payload = json.loads(body or b'{}')
+            row = _parse_features(payload, DISEASES[disease]['feature_columns'])
+            explain, top = _parse_explain(payload.get('explain'))
+        except (ValueError, TypeError, KeyError) as e:
+            timer.mark('parse')
+            timer.finish(error=True)
+            return 400, {'error': f'Invalid request body: {e}'}
+        timer.mark('parse')
+        try:
+            return await self._predict(disease, row, explain, top, timer)
+        except BaseException:
+            # Whatever failed (drift, scoring, a cancelled connection), close the timer so
+            # the request is counted as an error instead of staying open
+            timer.finish(error=True)
+            raise
+
+    async def _predict(self, disease, row, explain, top, timer):
+        self.requests += 1
+        # Every later step uses this one scorer (or the one the batch reports), so the
+        # probability, model_version and explanation always describe the same model
+        scorer = self.registry.get(disease)
+        self._drift_monitor(disease, scorer).observe(row)
+        timer.mark('drift')
+        probability = self.cache.get(disease, scorer.version, row) if self.cache else None
+        cache_hit = probability is not None
+        timer.mark('cache')
+        if not cache_hit:
+            probability, scorer = await self.batchers[disease].submit(row)
+            # Queue wait plus this request's share of the batched scoring
+            timer.mark('batch')
+            if not math.isfinite(probability):
+                # Finite but huge features (e.g. 1e308) can overflow the decision value
+                timer.finish(error=True)
+                return 400, {'error': 'Features are outside the range the model can score.'}
+            if self.cache:
+                self.cache.put(disease, scorer.version, row, probability)
+        response = {
+            'disease': disease,
+            'probability': probability,
+            'prediction': int(probability >= 0.5),
+            'model_version': scorer.version,
+        }
+        if explain:
+            explanation = scorer.explain(row, top=top, feature_names=DISEASES[disease]['feature_columns'])
+            response['explanation'] = {
+                'model_version': scorer.version,
+                'base_value': explanation.base_value,
+                'decision': explanation.decision,
+                'contributions': [c._asdict() for c in explanation.contributions],
+                'rest': explanation.rest,
+            }
+            timer.mark('explain')
+        body = json.dumps(response).encode()
+        timer.mark('render')
+        timer.finish(cache_hit=cache_hit)
+        return 200, body
+
+    def _drift_monitor(self, disease, scorer):
+        """
+        Returns the disease's drift monitor, starting a fresh one when the model version changes.
+        """
+        monitor = self.drift.get(disease)
+        if monitor is None or monitor.version != scorer.version:
+            monitor = self.drift[disease] = DriftMonitor.from_scorer(
+                scorer, DISEASES[disease]['feature_columns'], on_drift=lambda features: print(
+                    f"Warning: {disease} inputs drifted from training on: {', '.join(features)}"),
+            )
+        return monitor
+
+    async def _respond(self, writer, status, payload, keep_alive):
+        """
+        Sends a dict as JSON, bytes as already-encoded JSON and a str as plain text.
+        """
+        if isinstance(payload, str):
+            body, content_type = payload.encode(), 'text/plain; version=0.0.4; charset=utf-8'
+        elif isinstance(payload, bytes):
+            body, content_type = payload, 'application/json'
+        else:
+            body, content_type = json.dumps(payload).encode(), 'application/json'
+        reason = {
+            200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 413: 'Payload Too Large',
+            500: 'Internal Server Error',
+        }
+        head = (
+            f"HTTP/1.1 {status} {reason.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    def stats(self):
+        uptime = time.monotonic() - self.started
+        batches = {
+            name: {
+                'batches': batcher.batches,
+                'rows': batcher.rows,
+                'mean_batch_size': batcher.rows / batcher.batches if batcher.batches else 0.0,
+            }
+            for name, batcher in self.batchers.items()
+        }
+        stats = {
+            'uptime_seconds': uptime,
+            'requests': self.requests,
+            'model_versions': self.registry.versions(),
+            'model_reloads': self.registry.reloads,
+            'batching': batches,
+        }
+        if self.cache:
+            stats['cache'] = self.cache.stats()
+        return stats
+
+
+def _parse_features(payload, feature_columns):
+    """
+    Accepts {"features": [v1, ...]} in training order or {"features": {"column": v, ...}}.
+
+    Values must be finite JSON numbers: strings and booleans are rejected rather than
+    coerced by float(), and json.loads lets NaN and Infinity through.
+    """
+    features = payload['features']
+    if isinstance(features, dict):
+        features = [features[column] for column in feature_columns]
+    elif not isinstance(features, list):
+        raise ValueError(f'"features" must be a list or an object, got {type(features).__name__}')
+    if len(features) != len(feature_columns):
+        raise ValueError(f'expected {len(feature_columns)} features, got {len(features)}')
+    for column, value in zip(feature_columns, features):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f'feature {column!r} must be a number, got {value!r}')
+    row = []
+    for column, value in zip(feature_columns, features):
+        try:
+            value = float(value)
+        except OverflowError:  # an integer literal too big for a float
+            value = math.inf
+        if not math.isfinite(value):
+            raise ValueError(f'feature {column!r} must be a finite number, got {value}')
+        row.append(value)
+    return row
+
+
+def _parse_explain(value):
+    """
+    Returns (explain, top) for the optional "explain" field: true for every feature or a positive integer k.
+    """
+    if value is None or value is False:
+        return False, None
+    if value is True:
+        return True, None
+    if isinstance(value, int) and value > 0:
+        return True, value
+    raise ValueError(f'"explain" must be true or a positive integer, got {value!r}')
+
+
+def _log_slow(disease, seconds, stages):
+    breakdown = ', '.join(f"{stage} {elapsed * 1000:.2f} ms" for stage, elapsed in stages)
+    print(f"Slow {disease} request: {seconds * 1000:.2f} ms ({breakdown})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the health models over HTTP with micro-batching.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--model-dir', default=MODEL_DIR, help="Directory holding the trained models.")
+    parser.add_argument('--max-batch-size', type=int, default=256, help="Largest batch scored in one call.")
+    parser.add_argument('--max-wait-ms', type=float, default=2.0, help="Longest a request waits for its batch to fill.")
+    parser.add_argument('--reload-interval', type=float, default=5.0, help="Seconds between checks for retrained models.")
+    parser.add_argument('--cache-entries', type=int, default=100_000, help="Prediction cache size; 0 disables the cache.")
+    parser.add_argument('--cache-ttl', type=float, default=3600.0, help="Seconds a cached prediction stays valid.")
+    parser.add_argument('--no-metrics', action='store_true', help="Disable per-stage timing (GET /metrics stays empty).")
+    # No stack sampling here (unlike app.py): every request runs on the event-loop thread,
+    # whose stack shows the selector a slow request is waiting in, not the request itself.
+    # The per-stage breakdown, batch scoring included, is what locates the time.
+    parser.add_argument('--slow-ms', type=float, help="Log requests slower than this with their per-stage breakdown.")
+    args = parser.parse_args(argv)
+
+    registry = ModelRegistry(args.model_dir, poll_interval=args.reload_interval)
+    diseases = []
+    for disease in DISEASES:
+        try:
+            registry.get(disease)
+            diseases.append(disease)
+        except FileNotFoundError:
+            print(f"Warning: no trained model for {disease} in {args.model_dir}; skipping.")
+        except ValueError as e:  # includes ArtifactError for a damaged .hpm
+            print(f"Warning: skipping {disease}; its model in {args.model_dir} could not be loaded: {e}")
+    if not diseases:
+        print("Error: no models could be loaded. Run train.py first.")
+        return 1
+    registry.start()
+
+    cache = PredictionCache(max_entries=args.cache_entries, ttl=args.cache_ttl) if args.cache_entries > 0 else None
+    metrics = Metrics(enabled=not args.no_metrics, slow_threshold=args.slow_ms / 1000 if args.slow_ms else None, on_slow=_log_slow)
+    server = InferenceServer(registry, diseases, args.max_batch_size, args.max_wait_ms / 1000.0, cache, metrics)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
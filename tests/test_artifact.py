@@ -0,0 +1,93 @@
+"""
+.hpm artifacts must round-trip the shipped pickles exactly and reject damaged files with ArtifactError.
+"""
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from artifact import PREAMBLE, ArtifactError, load_artifact, read_header, save_artifact
+from linear_scorer import LinearScorer
+
+joblib = pytest.importorskip('joblib')
+pytest.importorskip('sklearn')
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DISEASES = ('diabetes', 'heart', 'parkinsons')
+
+
+@pytest.fixture(scope='module', params=DISEASES)
+def shipped(request):
+    model = joblib.load(os.path.join(ROOT, f'{request.param}_model.pkl'))
+    scaler = joblib.load(os.path.join(ROOT, f'{request.param}_scaler.pkl'))
+    return request.param, scaler, LinearScorer.from_estimators(model, scaler)
+
+
+@pytest.fixture
+def saved(shipped, tmp_path):
+    disease, _, scorer = shipped
+    path = tmp_path / f'{disease}.hpm'
+    save_artifact(str(path), scorer, disease)
+    return path
+
+
+def _damage(path, offset, length=1):
+    data = bytearray(path.read_bytes())
+    for i in range(offset, offset + length):
+        data[i] ^= 0xFF
+    path.write_bytes(bytes(data))
+
+
+def test_round_trip_matches_the_pickles(shipped, saved):
+    disease, scaler, scorer = shipped
+    loaded = load_artifact(str(saved))
+    header, data_offset = read_header(str(saved))
+
+    assert header['disease'] == disease
+    assert data_offset % 64 == 0
+    assert loaded.feature_names == scorer.feature_names
+    for name in ('mean', 'scale', 'coef', 'weights'):
+        np.testing.assert_array_equal(getattr(loaded, name), getattr(scorer, name))
+    np.testing.assert_array_equal(loaded.var, scaler.var_)
+    X = np.random.default_rng(0).normal(scaler.mean_, 2 * scaler.scale_, size=(50, scaler.mean_.shape[0]))
+    np.testing.assert_array_equal(loaded.predict_proba(X), scorer.predict_proba(X))
+
+
+def test_checksum_mismatch_is_rejected(saved):
+    _damage(saved, os.path.getsize(saved) - 3)  # inside the last array
+    with pytest.raises(ArtifactError, match='checksum'):
+        load_artifact(str(saved))
+    load_artifact(str(saved), verify=False)  # the layout itself is still readable
+
+
+@pytest.mark.parametrize('keep', [8, PREAMBLE.size + 10, -8])
+def test_truncated_file_is_rejected(saved, keep):
+    data = saved.read_bytes()
+    saved.write_bytes(data[:keep])
+    with pytest.raises(ArtifactError):
+        load_artifact(str(saved))
+
+
+def test_damaged_header_is_rejected(saved):
+    _damage(saved, PREAMBLE.size + 1)  # the header's first byte after '{'
+    with pytest.raises(ArtifactError, match='damaged header'):
+        read_header(str(saved))
+
+
+def test_oversized_header_length_is_rejected(saved):
+    data = bytearray(saved.read_bytes())
+    magic, version, reserved, _ = PREAMBLE.unpack_from(data)
+    data[:PREAMBLE.size] = PREAMBLE.pack(magic, version, reserved, 2 ** 31)
+    saved.write_bytes(bytes(data))
+    with pytest.raises(ArtifactError, match='truncated'):
+        read_header(str(saved))
+
+
+def test_cli_reports_a_damaged_file_as_invalid(saved):
+    _damage(saved, PREAMBLE.size + 1)
+    result = subprocess.run([sys.executable, os.path.join(ROOT, 'artifact.py'), str(saved)],
+                            capture_output=True, text=True, cwd=ROOT)
+    assert result.returncode == 0
+    assert 'INVALID' in result.stdout
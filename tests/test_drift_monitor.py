@@ -0,0 +1,114 @@
+"""
+DriftMonitor's running moments must match numpy over the same rows however they are
+split and merged, its quantiles must land within a histogram bin of the exact ones,
+and only real drift may be flagged.
+"""
+import numpy as np
+import pytest
+
+from drift_monitor import BIN_WIDTH, DriftMonitor
+
+MEAN = np.array([10.0, -3.0, 0.001])
+SCALE = np.array([2.0, 0.5, 1e-4])
+
+
+def _rows(n_rows, seed=0, shift=0.0, spread=1.0):
+    rng = np.random.default_rng(seed)
+    return rng.normal(MEAN + shift * SCALE, spread * SCALE, size=(n_rows, MEAN.shape[0]))
+
+
+@pytest.mark.parametrize('batch_rows', [1, 7, 1000, 5000])
+def test_batched_updates_match_numpy(batch_rows):
+    X = _rows(5000)
+    monitor = DriftMonitor(MEAN, SCALE)
+    for start in range(0, X.shape[0], batch_rows):
+        monitor.update(X[start:start + batch_rows])
+
+    assert monitor.count == X.shape[0]
+    np.testing.assert_allclose(monitor.mean, X.mean(axis=0), rtol=1e-12)
+    np.testing.assert_allclose(monitor.variance, X.var(axis=0, ddof=1), rtol=1e-9)
+
+
+def test_merged_summaries_match_a_single_pass():
+    # Uneven parts with different means, as score_csv's workers would produce
+    parts = [_rows(10, seed=1), _rows(3000, seed=2, shift=0.3), _rows(1, seed=3), _rows(700, seed=4, spread=2.0)]
+    merged = DriftMonitor(MEAN, SCALE)
+    for part in parts:
+        worker = DriftMonitor(MEAN, SCALE)
+        worker.update(part)
+        merged.merge_summary(worker.summary())
+    merged.merge_summary(DriftMonitor(MEAN, SCALE).summary())  # an empty worker changes nothing
+
+    single = DriftMonitor(MEAN, SCALE)
+    single.update(np.vstack(parts))
+    assert merged.count == single.count
+    np.testing.assert_allclose(merged.mean, single.mean, rtol=1e-12)
+    np.testing.assert_allclose(merged.variance, single.variance, rtol=1e-9)
+    np.testing.assert_array_equal(merged.histogram, single.histogram)
+
+
+def test_non_finite_and_huge_rows_are_skipped():
+    X = _rows(20)
+    X[3, 0] = np.nan
+    X[5, 1] = np.inf
+    X[7, 2] = 1e300
+    monitor = DriftMonitor(MEAN, SCALE)
+    monitor.update(X)
+
+    usable = np.ones(20, dtype=bool)
+    usable[[3, 5, 7]] = False
+    assert (monitor.count, monitor.skipped) == (17, 3)
+    np.testing.assert_allclose(monitor.mean, X[usable].mean(axis=0), rtol=1e-12)
+
+
+def test_quantiles_are_within_a_bin_of_numpy():
+    X = _rows(20000, spread=1.5)
+    monitor = DriftMonitor(MEAN, SCALE)
+    monitor.update(X)
+    qs = (0.05, 0.5, 0.95)
+
+    expected = np.quantile(X, qs, axis=0)
+    estimated = monitor.quantiles(qs)
+    for j in range(MEAN.shape[0]):
+        np.testing.assert_allclose(estimated[:, j], expected[:, j], rtol=0, atol=BIN_WIDTH * SCALE[j])
+
+
+def test_quantiles_are_nan_without_rows():
+    assert np.isnan(DriftMonitor(MEAN, SCALE).quantiles()).all()
+
+
+def test_only_shifted_or_rescaled_features_are_flagged():
+    flagged = []
+    monitor = DriftMonitor(MEAN, SCALE, feature_names=['a', 'b', 'c'], on_drift=flagged.append)
+    X = _rows(2000)
+    X[:, 1] = MEAN[1] + (X[:, 1] - MEAN[1]) * 3  # variance ratio ~9
+    X[:, 2] += SCALE[2]  # one training standard deviation
+    monitor.update(X)
+
+    report = {entry['feature']: entry for entry in monitor.report()}
+    assert [name for name, entry in report.items() if entry['drifted']] == ['b', 'c']
+    assert report['b']['variance_ratio'] == pytest.approx(9.0, rel=0.1)
+    assert report['c']['mean_shift'] == pytest.approx(1.0, abs=0.1)
+    assert flagged == [['b', 'c']]
+
+
+def test_constant_training_feature_is_not_flagged_for_variance():
+    # StandardScaler reports var_ 0 but scale_ 1 for a feature that was constant in training
+    mean, scale, variance = np.array([5.0, 0.0]), np.array([2.0, 1.0]), np.array([4.0, 0.0])
+    monitor = DriftMonitor(mean, scale, variance)
+    monitor.update(np.column_stack([np.random.default_rng(0).normal(5.0, 2.0, 500), np.zeros(500)]))
+
+    constant = monitor.report()[1]
+    assert constant['variance_ratio'] is None
+    assert constant['reference_std'] == 0.0
+    assert not constant['drifted']
+    # Without var_ the same feature would wrongly get a variance ratio of 0
+    fallback = DriftMonitor(mean, scale)
+    fallback.merge_summary(monitor.summary())
+    assert fallback.report()[1]['drifted']
+
+
+def test_nothing_is_flagged_below_min_count():
+    monitor = DriftMonitor(MEAN, SCALE, min_count=100)
+    monitor.update(_rows(99, shift=5.0))
+    assert not any(entry['drifted'] for entry in monitor.report())
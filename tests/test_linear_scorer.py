@@ -0,0 +1,106 @@
+"""
+LinearScorer must reproduce SVC.predict_proba on the shipped models, on both the
+scalar (<= SCALAR_COUPLING_MAX_ROWS rows) and the vectorized coupling path.
+"""
+import os
+
+import numpy as np
+import pytest
+
+from linear_scorer import SCALAR_COUPLING_MAX_ROWS, LinearScorer
+
+joblib = pytest.importorskip('joblib')
+pd = pytest.importorskip('pandas')
+pytest.importorskip('sklearn')
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DISEASES = ('diabetes', 'heart', 'parkinsons')
+ROW_COUNTS = (1, SCALAR_COUPLING_MAX_ROWS, SCALAR_COUPLING_MAX_ROWS + 1, 500)
+
+
+@pytest.fixture(scope='module', params=DISEASES)
+def shipped(request):
+    model = joblib.load(os.path.join(ROOT, f'{request.param}_model.pkl'))
+    scaler = joblib.load(os.path.join(ROOT, f'{request.param}_scaler.pkl'))
+    return model, scaler, LinearScorer.from_estimators(model, scaler)
+
+
+def _rows(scaler, n_rows, seed=0):
+    # Inputs spread around the training distribution, including confident predictions either way
+    rng = np.random.default_rng(seed)
+    return rng.normal(scaler.mean_, 2 * scaler.scale_, size=(n_rows, scaler.mean_.shape[0]))
+
+
+def _sklearn_proba(model, scaler, X):
+    frame = pd.DataFrame(X, columns=scaler.feature_names_in_)
+    return model.predict_proba(scaler.transform(frame))
+
+
+@pytest.mark.parametrize('n_rows', ROW_COUNTS)
+def test_predict_proba_matches_svc(shipped, n_rows):
+    model, scaler, scorer = shipped
+    X = _rows(scaler, n_rows)
+    np.testing.assert_allclose(scorer.predict_proba(X), _sklearn_proba(model, scaler, X), rtol=0, atol=1e-9)
+
+
+def test_single_1d_row_matches_svc(shipped):
+    model, scaler, scorer = shipped
+    row = _rows(scaler, 1)[0]
+    np.testing.assert_allclose(scorer.predict_proba(row), _sklearn_proba(model, scaler, row[None, :]), rtol=0, atol=1e-9)
+
+
+def test_decision_function_matches_svc(shipped):
+    model, scaler, scorer = shipped
+    X = _rows(scaler, 200)
+    expected = model.decision_function(scaler.transform(pd.DataFrame(X, columns=scaler.feature_names_in_)))
+    np.testing.assert_allclose(scorer.decision_function(X), expected, rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize('n_rows', ROW_COUNTS[1:])
+@pytest.mark.parametrize('bad_value', [np.nan, np.inf, -np.inf])
+def test_non_finite_rows_give_nan_on_both_paths(shipped, n_rows, bad_value):
+    model, scaler, scorer = shipped
+    X = _rows(scaler, n_rows)
+    bad = np.zeros(n_rows, dtype=bool)
+    bad[[0, n_rows - 1]] = True
+    X[bad, 1] = bad_value
+
+    proba = scorer.predict_proba(X)
+    assert np.isnan(proba[bad]).all()
+    np.testing.assert_allclose(proba[~bad], _sklearn_proba(model, scaler, X[~bad]), rtol=0, atol=1e-9)
+
+
+def test_scalar_and_vectorized_paths_agree(shipped):
+    _, scaler, scorer = shipped
+    decision = scorer.decision_function(_rows(scaler, 4 * SCALAR_COUPLING_MAX_ROWS))
+    decision[3] = np.nan
+    vectorized = scorer.proba_from_decision(decision)
+    scalar = np.vstack([
+        scorer.proba_from_decision(decision[i:i + SCALAR_COUPLING_MAX_ROWS])
+        for i in range(0, decision.shape[0], SCALAR_COUPLING_MAX_ROWS)
+    ])
+    np.testing.assert_allclose(vectorized, scalar, rtol=0, atol=1e-12, equal_nan=True)
+
+
+@pytest.mark.parametrize('top', [0, 3, None])
+def test_rank_contributions_shapes_and_order(shipped, top):
+    _, scaler, scorer = shipped
+    row = _rows(scaler, 1)[0]
+    k = scorer.n_features if top is None else top
+
+    for X, n_rows in ((row, 1), (_rows(scaler, 5), 5)):
+        order, values = scorer.rank_contributions(X, top)
+        assert order.shape == values.shape == (n_rows, k)
+        magnitude = np.abs(values)
+        assert (magnitude[:, :-1] >= magnitude[:, 1:]).all()
+        np.testing.assert_array_equal(values, np.take_along_axis(scorer.contributions(X), order, axis=1))
+
+
+def test_explanation_adds_up_to_the_decision(shipped):
+    _, scaler, scorer = shipped
+    row = _rows(scaler, 1)[0]
+    explanation = scorer.explain(row, top=3)
+    total = explanation.base_value + sum(c.contribution for c in explanation.contributions) + explanation.rest
+    assert len(explanation.contributions) == 3
+    assert total == pytest.approx(explanation.decision, abs=1e-9)
+    assert explanation.decision == pytest.approx(float(scorer.decision_function(row)[0]), abs=1e-12)
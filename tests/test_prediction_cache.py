@@ -0,0 +1,152 @@
+import pytest
+
+from prediction_cache import PredictionCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_hit_after_put_and_counters():
+    cache = PredictionCache()
+    assert cache.get('heart', 'v1', [1.0, 2.0]) is None
+    cache.put('heart', 'v1', [1.0, 2.0], 0.25)
+    assert cache.get('heart', 'v1', [1.0, 2.0]) == 0.25
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
+    assert stats['hit_rate'] == 0.5
+
+
+def test_keys_are_canonicalised():
+    cache = PredictionCache(significant_digits=9)
+    cache.put('heart', 'v1', [0.0, 1.0], 0.7)
+    assert cache.get('heart', 'v1', [-0.0, 1.0 + 1e-12]) == 0.7
+    assert cache.get('heart', 'v1', [[0.0, 1.0]]) == 0.7
+    assert cache.get('heart', 'v1', [0.0, 1.000001]) is None
+
+
+def test_key_precision_is_relative_to_magnitude():
+    cache = PredictionCache()
+    cache.put('parkinsons', 'v1', [4.4e-5], 0.2)
+    assert cache.get('parkinsons', 'v1', [4.4e-5 * (1 + 1e-13)]) == 0.2
+    assert cache.get('parkinsons', 'v1', [4.5e-5]) is None
+
+
+def test_huge_and_non_finite_features_get_distinct_keys():
+    cache = PredictionCache()
+    cache.put('heart', 'v1', [1e308], 0.9)
+    assert cache.get('heart', 'v1', [1e303]) is None
+    assert cache.get('heart', 'v1', [float('inf')]) is None
+    assert cache.get('heart', 'v1', [1e308]) == 0.9
+
+
+def test_non_finite_probabilities_are_not_stored():
+    cache = PredictionCache()
+    cache.put('heart', 'v1', [1.0], float('nan'))
+    cache.put('heart', 'v1', [2.0], float('inf'))
+    assert cache.stats()['entries'] == 0
+    assert cache.get('heart', 'v1', [1.0]) is None
+
+
+def test_keys_include_disease_and_version():
+    cache = PredictionCache()
+    cache.put('heart', 'v1', [1.0], 0.1)
+    assert cache.get('diabetes', 'v1', [1.0]) is None
+    assert cache.get('heart', 'v1', [1.0]) == 0.1
+
+
+def test_lru_eviction_order():
+    cache = PredictionCache(max_entries=2)
+    cache.put('heart', 'v1', [1.0], 0.1)
+    cache.put('heart', 'v1', [2.0], 0.2)
+    assert cache.get('heart', 'v1', [1.0]) == 0.1  # [2.0] is now least recently used
+    cache.put('heart', 'v1', [3.0], 0.3)
+
+    assert cache.get('heart', 'v1', [2.0]) is None
+    assert cache.get('heart', 'v1', [1.0]) == 0.1
+    assert cache.get('heart', 'v1', [3.0]) == 0.3
+    assert cache.stats()['evictions'] == 1
+
+
+def test_put_of_existing_key_refreshes_it():
+    cache = PredictionCache(max_entries=2)
+    cache.put('heart', 'v1', [1.0], 0.1)
+    cache.put('heart', 'v1', [2.0], 0.2)
+    cache.put('heart', 'v1', [1.0], 0.15)
+    cache.put('heart', 'v1', [3.0], 0.3)
+
+    assert cache.get('heart', 'v1', [1.0]) == 0.15
+    assert cache.get('heart', 'v1', [2.0]) is None
+    assert cache.stats()['entries'] == 2
+
+
+def test_ttl_expiry(clock):
+    cache = PredictionCache(ttl=10.0, clock=clock)
+    cache.put('heart', 'v1', [1.0], 0.1)
+    clock.now = 9.9
+    assert cache.get('heart', 'v1', [1.0]) == 0.1
+    clock.now = 10.0
+    assert cache.get('heart', 'v1', [1.0]) is None
+
+    stats = cache.stats()
+    assert (stats['expirations'], stats['entries'], stats['bytes']) == (1, 0, 0)
+
+
+def test_ttl_counts_from_the_last_put(clock):
+    cache = PredictionCache(ttl=10.0, clock=clock)
+    cache.put('heart', 'v1', [1.0], 0.1)
+    clock.now = 8.0
+    cache.put('heart', 'v1', [1.0], 0.1)
+    clock.now = 15.0
+    assert cache.get('heart', 'v1', [1.0]) == 0.1
+
+
+def test_byte_cap_evicts_least_recently_used():
+    probe = PredictionCache()
+    probe.put('heart', 'v1', [1.0, 2.0], 0.0)
+    entry_bytes = probe.stats()['bytes']
+
+    cache = PredictionCache(max_bytes=3 * entry_bytes)
+    for i in range(4):
+        cache.put('heart', 'v1', [float(i), 0.0], i / 10)
+
+    stats = cache.stats()
+    assert stats['entries'] == 3
+    assert stats['bytes'] == 3 * entry_bytes
+    assert stats['evictions'] == 1
+    assert cache.get('heart', 'v1', [0.0, 0.0]) is None
+    assert cache.get('heart', 'v1', [3.0, 0.0]) == 0.3
+
+
+def test_versions_are_isolated_across_a_hot_swap():
+    cache = PredictionCache()
+    cache.put('heart', 'v1', [1.0], 0.1)
+    cache.put('heart', 'v2', [1.0], 0.2)
+
+    # A request still scoring on the replaced model (and a late put from it) must
+    # neither be served the new model's result nor drop the new model's entries
+    assert cache.get('heart', 'v1', [1.0]) == 0.1
+    cache.put('heart', 'v1', [2.0], 0.3)
+    assert cache.get('heart', 'v2', [1.0]) == 0.2
+    assert cache.get('heart', 'v2', [2.0]) is None
+
+
+def test_replaced_versions_age_out_through_lru():
+    cache = PredictionCache(max_entries=2)
+    cache.put('heart', 'v1', [1.0], 0.1)
+    cache.put('heart', 'v1', [2.0], 0.2)
+    cache.put('heart', 'v2', [1.0], 0.3)
+    cache.put('heart', 'v2', [2.0], 0.4)
+
+    assert cache.stats()['evictions'] == 2
+    assert cache.get('heart', 'v1', [1.0]) is None
+    assert cache.get('heart', 'v2', [1.0]) == 0.3
@@ -1,71 +1,256 @@
 import pandas as pd
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import GridSearchCV, StratifiedKFold, train_test_split
 from sklearn.preprocessing import StandardScaler
-from sklearn.svm import SVC
+from sklearn.metrics import accuracy_score, brier_score_loss, roc_auc_score
+from sklearn.svm import SVC, LinearSVC
+from concurrent.futures import ProcessPoolExecutor
+import argparse
 import joblib
+import json
+import numpy as np
 import os
+import time
 
-def train_and_save_model(dataset_path, model_save_path, scaler_save_path, target_column, id_column=None):
+from artifact import save_artifact
+from calibration import fit_platt
+from dataset_cache import CACHE_DIR as DATASET_CACHE_DIR, load_dataset
+from diseases import DISEASES, MODEL_DIR, artifact_path, dataset_schema, model_paths
+from linear_scorer import LinearScorer
+
+# 'svc': libsvm SVC(kernel='linear', probability=True), Platt fitted by libsvm's internal 5-fold CV.
+# 'linear': liblinear primal solver plus one Platt fit on a held-out calibration slice.
+ENGINES = ('svc', 'linear')
+
+# Hyperparameters searched for every dataset unless a different grid is passed in
+DEFAULT_PARAM_GRID = {
+    'C': [0.01, 0.1, 1.0, 10.0],
+    'class_weight': [None, 'balanced'],
+}
+
+def training_job(disease, model_dir=MODEL_DIR, dataset_path=None):
+    """
+    Returns the train_and_save_model keyword arguments for a disease, taken from its
+    schema in diseases.DISEASES; `dataset_path` overrides the schema's CSV.
+    """
+    spec = DISEASES[disease]
+    model_path, scaler_path = model_paths(disease, model_dir)
+    return dict(
+        dataset_path=dataset_path or spec['dataset_path'],
+        model_save_path=model_path,
+        scaler_save_path=scaler_path,
+        artifact_save_path=artifact_path(disease, model_dir),
+        target_column=spec['target_column'],
+        id_column=spec['id_column'],  # e.g. Parkinson's 'name', dropped along with the target
+        dtypes=dataset_schema(disease),
+        feature_columns=spec['feature_columns'],  # selected in this order, whatever the CSV's column order
+    )
+
+TRAINING_JOBS = [training_job(disease) for disease in DISEASES]
+
+def _base_estimator(engine):
+    if engine == 'linear':
+        return LinearSVC(dual=False)
+    return SVC(kernel='linear')
+
+def fit_classifier(X_train, Y_train, engine='svc', params=None, calibration_size=0.2):
+    """
+    Fits a probability-calibrated linear classifier on standardized features.
+
+    Both engines return an estimator with coef_, intercept_, classes_ and libsvm-convention
+    Platt parameters probA_/probB_, so LinearScorer and the .hpm artifact treat them the same.
+    """
+    params = params or {}
+    if engine == 'svc':
+        classifier = SVC(kernel='linear', probability=True, **params)
+        classifier.fit(X_train, Y_train)
+        return classifier
+
+    if engine == 'linear':
+        X_fit, X_cal, Y_fit, Y_cal = train_test_split(X_train, Y_train, test_size=calibration_size, stratify=Y_train, random_state=2)
+        classifier = LinearSVC(dual=False, **params)
+        classifier.fit(X_fit, Y_fit)
+
+        # libsvm's sigmoid is fitted on its own decision values, which are sklearn's negated,
+        # with the first class as the positive label
+        decision = classifier.decision_function(X_cal)
+        prob_a, prob_b = fit_platt(-decision, np.asarray(Y_cal) == classifier.classes_[0])
+        classifier.probA_ = np.array([prob_a])
+        classifier.probB_ = np.array([prob_b])
+        return classifier
+
+    raise ValueError(f"Unknown engine {engine!r}; expected one of {ENGINES}.")
+
+def train_and_save_model(dataset_path, model_save_path, scaler_save_path, target_column, id_column=None, artifact_save_path=None,
+                         param_grid=None, cv=5, n_jobs=1, engine='svc', dtypes=None, dataset_cache_dir=DATASET_CACHE_DIR,
+                         feature_columns=None):
     """
     Loads data, trains a Support Vector Machine (SVM) model, and saves the model and scaler.
+    If artifact_save_path is given, the pair is also exported as a compact .hpm artifact for serving.
+
+    The parsed dataset (read with the `dtypes` schema) is cached in `dataset_cache_dir` and
+    memory-mapped on later runs over the same file; pass dataset_cache_dir=None to always parse.
+    `feature_columns` fixes the features and their order; by default every other column is used in file order.
+
+    With a param_grid, C/class_weight are chosen by a stratified `cv`-fold grid search that
+    runs on `n_jobs` cores before the final probability=True fit. Returns a report dict with
+    per-fold metrics and wall-clock seconds per stage, or None if training failed.
+    `engine` selects the solver, see ENGINES.
     """
     if not os.path.exists(dataset_path):
         print(f"Error: The file {dataset_path} was not found. Please download it and place it in the 'datasets' folder.")
         return
 
     os.makedirs(os.path.dirname(model_save_path), exist_ok=True)
+    timings = {}
+    report = {'dataset': dataset_path, 'engine': engine, 'timings': timings}
 
     try:
-        df = pd.read_csv(dataset_path)
-
-        # Separate features (X) and target (Y)
-        Y = df[target_column]
-        # --- THIS IS THE FIX ---
-        # Drop the target column and the non-numeric ID column if it exists
-        X = df.drop(columns=[target_column], axis=1)
-        if id_column:
-            X = X.drop(columns=[id_column], axis=1)
-        # ---------------------
+        stage_start = time.perf_counter()
+        # Features (X) without the target and the non-numeric ID column, and the target (Y)
+        X, Y, feature_names, cache_info = load_dataset(dataset_path, target_column, id_column, dtypes, dataset_cache_dir, feature_columns)
+        # Wrapping the (possibly memory-mapped) array doesn't copy it; the column names
+        # end up in the scaler's feature_names_in_
+        X = pd.DataFrame(X, columns=feature_names, copy=False)
+        timings['load'] = time.perf_counter() - stage_start
+        report['dataset_cache'] = cache_info
+        if cache_info['hit']:
+            print(f"Loaded {dataset_path} from the dataset cache in {cache_info['load_seconds'] * 1000:.1f} ms "
+                  f"(parsing took {cache_info['parse_seconds']:.2f}s, saved {cache_info['saved_seconds']:.2f}s)")
 
+        stage_start = time.perf_counter()
         scaler = StandardScaler()
         scaler.fit(X)
         X_standardized = scaler.transform(X)
 
         X_train, X_test, Y_train, Y_test = train_test_split(X_standardized, Y, test_size=0.2, stratify=Y, random_state=2)
+        timings['scale_and_split'] = time.perf_counter() - stage_start
 
-        classifier = SVC(kernel='linear', probability=True)
-        classifier.fit(X_train, Y_train)
+        best_params = {}
+        if param_grid:
+            # Search without probability=True: Platt's internal CV would run once per candidate per fold
+            stage_start = time.perf_counter()
+            search = GridSearchCV(
+                _base_estimator(engine),
+                param_grid,
+                scoring={'roc_auc': 'roc_auc', 'accuracy': 'accuracy'},
+                refit='roc_auc',
+                cv=StratifiedKFold(n_splits=cv, shuffle=True, random_state=2),
+                n_jobs=n_jobs,
+            )
+            search.fit(X_train, Y_train)
+            best_params = search.best_params_
+            report['search'] = _search_report(search, cv)
+            timings['search'] = time.perf_counter() - stage_start
+
+        stage_start = time.perf_counter()
+        classifier = fit_classifier(X_train, Y_train, engine, best_params)
+        scorer = LinearScorer.from_estimators(classifier, scaler)
+        timings['fit'] = time.perf_counter() - stage_start
+
+        stage_start = time.perf_counter()
+        # X_test is already standardized, so score from the decision function rather than raw rows
+        probabilities = scorer.proba_from_decision(classifier.decision_function(X_test))[:, 1]
+        report['best_params'] = best_params
+        report['test'] = {
+            'roc_auc': float(roc_auc_score(Y_test, probabilities)),
+            'brier': float(brier_score_loss(Y_test, probabilities, pos_label=scorer.classes[1])),
+            'accuracy': float(accuracy_score(Y_test, classifier.predict(X_test))),
+        }
+        timings['evaluate'] = time.perf_counter() - stage_start
 
+        stage_start = time.perf_counter()
         joblib.dump(classifier, model_save_path)
         joblib.dump(scaler, scaler_save_path)
-        
+        if artifact_save_path:
+            disease = os.path.splitext(os.path.basename(artifact_save_path))[0]
+            save_artifact(artifact_save_path, scorer, disease=disease)
+        timings['save'] = time.perf_counter() - stage_start
+
         print(f"Successfully trained and saved model from {dataset_path} to {model_save_path}")
+        return report
 
     except Exception as e:
         print(f"An error occurred while processing {dataset_path}: {e}")
 
-if __name__ == "__main__":
-    # 1. Train Diabetes Model
-    train_and_save_model(
-        dataset_path='datasets/diabetes.csv',
-        model_save_path='models/diabetes_model.pkl',
-        scaler_save_path='models/diabetes_scaler.pkl',
-        target_column='Outcome'
-    )
+def _search_report(search, cv):
+    """
+    Flattens GridSearchCV.cv_results_ into one entry per candidate with its per-fold scores.
+    """
+    results = search.cv_results_
+    candidates = []
+    for i, params in enumerate(results['params']):
+        candidates.append({
+            'params': params,
+            'rank': int(results['rank_test_roc_auc'][i]),
+            'mean_fit_seconds': float(results['mean_fit_time'][i]),
+            'folds': [
+                {
+                    'roc_auc': float(results[f'split{fold}_test_roc_auc'][i]),
+                    'accuracy': float(results[f'split{fold}_test_accuracy'][i]),
+                }
+                for fold in range(cv)
+            ],
+        })
+    return {'best_params': search.best_params_, 'best_roc_auc': float(search.best_score_), 'candidates': candidates}
 
-    # 2. Train Heart Disease Model
-    train_and_save_model(
-        dataset_path='datasets/heart.csv',
-        model_save_path='models/heart_model.pkl',
-        scaler_save_path='models/heart_scaler.pkl',
-        target_column='target'
-    )
+def train_all(jobs=TRAINING_JOBS, n_jobs=None, param_grid=DEFAULT_PARAM_GRID, cv=5, report_path=None, engine='svc',
+              dataset_cache_dir=DATASET_CACHE_DIR):
+    """
+    Trains every dataset in `jobs` concurrently and returns the combined report.
+
+    The `n_jobs` core budget is shared: one process per dataset, and each
+    dataset's grid search gets an equal share of the budget.
+    """
+    n_jobs = n_jobs or os.cpu_count() or 1
+    n_workers = max(1, min(len(jobs), n_jobs))
+    inner_jobs = max(1, n_jobs // n_workers)
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        futures = [
+            pool.submit(train_and_save_model, **job, param_grid=param_grid, cv=cv, n_jobs=inner_jobs, engine=engine,
+                        dataset_cache_dir=dataset_cache_dir)
+            for job in jobs
+        ]
+        results = [future.result() for future in futures]
+
+    report = {
+        'engine': engine,
+        'n_jobs': n_jobs,
+        'dataset_workers': n_workers,
+        'search_jobs_per_dataset': inner_jobs,
+        'param_grid': param_grid,
+        'cv_folds': cv,
+        'wall_seconds': time.perf_counter() - start,
+        'dataset_cache_saved_seconds': sum(
+            result['dataset_cache']['saved_seconds'] for result in results if result is not None),
+        'datasets': [result for result in results if result is not None],
+    }
+    if report_path:
+        os.makedirs(os.path.dirname(report_path) or '.', exist_ok=True)
+        with open(report_path, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"Training report written to {report_path}")
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the diabetes, heart and Parkinson's models.")
+    parser.add_argument('--n-jobs', type=int, default=os.cpu_count(), help="Total cores shared by all datasets (default: all).")
+    parser.add_argument('--cv', type=int, default=5, help="Cross-validation folds for the hyperparameter search.")
+    parser.add_argument('--no-search', action='store_true', help="Skip the search and train the fixed SVC configuration.")
+    parser.add_argument('--engine', choices=ENGINES, default='svc', help="'svc' (libsvm, default) or 'linear' (liblinear + held-out Platt calibration).")
+    parser.add_argument('--report', default='models/training_report.json', help="Where to write the JSON training report.")
+    parser.add_argument('--no-dataset-cache', action='store_true', help="Always parse the CSVs instead of using the parsed-dataset cache.")
+    args = parser.parse_args()
 
-    # 3. Train Parkinson's Model (with the fix)
-    train_and_save_model(
-        dataset_path='datasets/parkinsons.csv',
-        model_save_path='models/parkinsons_model.pkl',
-        scaler_save_path='models/parkinsons_scaler.pkl',
-        target_column='status',
-        id_column='name'  # Tell the function to also drop the 'name' column
+    report = train_all(
+        n_jobs=args.n_jobs,
+        param_grid=None if args.no_search else DEFAULT_PARAM_GRID,
+        cv=args.cv,
+        report_path=args.report,
+        engine=args.engine,
+        dataset_cache_dir=None if args.no_dataset_cache else DATASET_CACHE_DIR,
     )
+    print(f"Trained {len(report['datasets'])} of {len(TRAINING_JOBS)} models in {report['wall_seconds']:.1f}s")
+    if report['dataset_cache_saved_seconds']:
+        print(f"The dataset cache saved {report['dataset_cache_saved_seconds']:.2f}s of CSV parsing")
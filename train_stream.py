@@ -0,0 +1,325 @@
+"""
+Out-of-core training for datasets that don't fit in memory.
+
+The CSV is read in fixed-size chunks, twice:
+
+    1. scaler pass:  StandardScaler.partial_fit on every chunk (running mean/variance)
+                     and per-class row counts.
+    2. model pass:   each chunk is standardized; a stratified sample of every chunk is
+                     held out into bounded per-class reservoirs and the rest goes to
+                     SGDClassifier(loss='hinge').partial_fit, a linear SVM trained by SGD.
+
+The reservoirs are then split in two halves: one fits Platt's sigmoid (in libsvm's
+convention, like train.py's 'linear' engine) and the other is used for evaluation.
+Peak memory is one chunk plus the reservoirs. Progress, including the byte offset
+reached in the file, is checkpointed periodically, so an interrupted run seeks back to
+where it stopped when started again.
+
+Chunks are cut on line boundaries before parsing, so rows must not contain quoted
+fields with embedded newlines.
+
+Example:
+    python train_stream.py datasets/heart_full.csv --disease heart --chunksize 200000 --checkpoint models/heart.ckpt
+"""
+import argparse
+import csv
+import io
+import itertools
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import accuracy_score, brier_score_loss, roc_auc_score
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+from artifact import save_artifact
+from calibration import fit_platt
+from diseases import DISEASES, MODEL_DIR, artifact_path, model_paths
+from linear_scorer import LinearScorer
+
+
+def _dataset_signature(path):
+    stat = os.stat(path)
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+def _save_checkpoint(path, state):
+    tmp_path = f'{path}.tmp'
+    joblib.dump(state, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _read_chunks(dataset_path, chunksize, skip_chunks=0, offset=None):
+    """
+    Yields (chunk_index, DataFrame, end_offset) starting after `skip_chunks` already-processed chunks.
+
+    `end_offset` is the byte offset just past the chunk. Passing the one checkpointed with
+    the last processed chunk as `offset` resumes with a seek; without it the skipped lines
+    are read and discarded one at a time. Either way memory doesn't grow with the skip.
+    """
+    with open(dataset_path, 'rb') as handle:
+        header = next(csv.reader([handle.readline().decode('utf-8-sig')]))
+        if offset is not None:
+            handle.seek(offset)
+        else:
+            for _ in range(skip_chunks * chunksize):
+                if not handle.readline():
+                    break
+        position = handle.tell()
+        index = skip_chunks
+        while True:
+            lines = list(itertools.islice(handle, chunksize))
+            if not lines:
+                break
+            position += sum(len(line) for line in lines)
+            chunk = pd.read_csv(io.BytesIO(b''.join(lines)), names=header, header=None)
+            if len(chunk):  # a block of blank lines parses to nothing
+                yield index, chunk, position
+            index += 1
+
+
+def _split_features(chunk, target_column, id_column, feature_columns=None):
+    """
+    Returns (X, y); with `feature_columns` X holds exactly those columns in that order, whatever the file's order.
+    """
+    y = chunk[target_column].to_numpy()
+    if feature_columns is not None:
+        return chunk[list(feature_columns)], y
+    X = chunk.drop(columns=[target_column])
+    if id_column:
+        X = X.drop(columns=[id_column])
+    return X, y
+
+
+def _reservoir_add(reservoir, X, rng):
+    """
+    Vectorized Algorithm R: offers rows of X to a fixed-capacity uniform sample.
+    """
+    rows, seen = reservoir['rows'], reservoir['seen']
+    capacity = rows.shape[0]
+    positions = seen + np.arange(X.shape[0])
+
+    slots = positions.copy()
+    full = positions >= capacity
+    slots[full] = rng.integers(0, positions[full] + 1)
+    keep = slots < capacity
+    # Later rows win duplicate slots, exactly as the sequential algorithm would
+    rows[slots[keep]] = X[keep]
+    reservoir['seen'] = seen + X.shape[0]
+
+
+def train_streaming(dataset_path, model_save_path, scaler_save_path, target_column, id_column=None, artifact_save_path=None,
+                    chunksize=100_000, epochs=1, holdout_fraction=0.1, max_holdout_rows=200_000, alpha=1e-4,
+                    class_weight=None, checkpoint_path=None, checkpoint_interval=30.0, random_state=2, feature_columns=None):
+    """
+    Trains a calibrated linear SVM from `dataset_path` in bounded memory and saves it like train_and_save_model.
+
+    `feature_columns` fixes the features and their order; by default every other column is used in file order.
+
+    The checkpoint is rewritten at most every `checkpoint_interval` seconds and at the end of each pass.
+    Returns a report dict with hold-out metrics and timings, or None if training failed.
+    """
+    if not os.path.exists(dataset_path):
+        print(f"Error: The file {dataset_path} was not found.")
+        return
+
+    os.makedirs(os.path.dirname(model_save_path), exist_ok=True)
+    signature = _dataset_signature(dataset_path)
+
+    state = None
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        state = joblib.load(checkpoint_path)
+        if (state['signature'] != signature or state['chunksize'] != chunksize
+                or state.get('feature_columns') != feature_columns):
+            print(f"Ignoring checkpoint {checkpoint_path}: it was written for a different file, chunk size or feature columns.")
+            state = None
+        else:
+            print(f"Resuming from {checkpoint_path} ({state['stage']} pass, epoch {state['epoch']}, {state['chunks_done']} chunks done)")
+    if state is None:
+        state = {
+            'signature': signature,
+            'chunksize': chunksize,
+            'feature_columns': feature_columns,
+            'stage': 'scale',
+            'epoch': 0,
+            'chunks_done': 0,
+            'offset': None,
+            'scaler': StandardScaler(),
+            'class_counts': {},
+            'classifier': None,
+            'reservoirs': None,
+            'reservoir_rng': np.random.default_rng(random_state),
+            'timings': {},
+        }
+
+    last_checkpoint = [time.monotonic()]
+
+    def checkpoint(force=False):
+        if checkpoint_path and (force or time.monotonic() - last_checkpoint[0] >= checkpoint_interval):
+            _save_checkpoint(checkpoint_path, state)
+            last_checkpoint[0] = time.monotonic()
+
+    try:
+        # --- Pass 1: running mean/variance for the scaler ---
+        if state['stage'] == 'scale':
+            stage_start = time.perf_counter()
+            for index, chunk, offset in _read_chunks(dataset_path, chunksize, state['chunks_done'], state.get('offset')):
+                X, y = _split_features(chunk, target_column, id_column, feature_columns)
+                state['scaler'].partial_fit(X)
+                labels, counts = np.unique(y, return_counts=True)
+                for label, count in zip(labels.tolist(), counts.tolist()):
+                    state['class_counts'][label] = state['class_counts'].get(label, 0) + count
+                state['chunks_done'] = index + 1
+                state['offset'] = offset
+                checkpoint()
+
+            state['timings']['scale_pass'] = state['timings'].get('scale_pass', 0.0) + time.perf_counter() - stage_start
+            state['stage'] = 'fit'
+            state['chunks_done'] = 0
+            state['offset'] = None
+            checkpoint(force=True)
+
+        classes = np.array(sorted(state['class_counts']))
+        counts = np.array([state['class_counts'][label] for label in classes], dtype=np.float64)
+        if len(classes) != 2:
+            raise ValueError(f"Expected a binary target, found classes {classes.tolist()}.")
+
+        if state['classifier'] is None:
+            if class_weight == 'balanced':
+                # partial_fit can't compute 'balanced' itself; derive it from the pass-1 counts
+                class_weight = {label: counts.sum() / (len(classes) * count) for label, count in zip(classes.tolist(), counts)}
+            state['classifier'] = SGDClassifier(loss='hinge', alpha=alpha, class_weight=class_weight, random_state=random_state)
+            n_features = state['scaler'].n_features_in_
+            state['reservoirs'] = {
+                label: {'rows': np.empty((max(1, int(max_holdout_rows * count / counts.sum())), n_features)), 'seen': 0}
+                for label, count in zip(classes.tolist(), counts)
+            }
+
+        # --- Pass 2: incremental linear SVM with stratified hold-out ---
+        if state['stage'] == 'fit':
+            stage_start = time.perf_counter()
+            scaler, classifier = state['scaler'], state['classifier']
+            while state['epoch'] < epochs:
+                for index, chunk, offset in _read_chunks(dataset_path, chunksize, state['chunks_done'], state.get('offset')):
+                    X, y = _split_features(chunk, target_column, id_column, feature_columns)
+                    X = scaler.transform(X)
+
+                    # Seeded by chunk index alone, so every epoch (and a resumed run) holds out the same rows
+                    chunk_rng = np.random.default_rng([random_state, index])
+                    holdout = np.zeros(len(y), dtype=bool)
+                    for label in classes.tolist():
+                        members = np.flatnonzero(y == label)
+                        n_holdout = int(round(holdout_fraction * len(members)))
+                        holdout[chunk_rng.choice(members, n_holdout, replace=False)] = True
+
+                    if state['epoch'] == 0:
+                        for label in classes.tolist():
+                            _reservoir_add(state['reservoirs'][label], X[holdout & (y == label)], state['reservoir_rng'])
+
+                    train_rows = chunk_rng.permutation(np.flatnonzero(~holdout))
+                    if len(train_rows):
+                        classifier.partial_fit(X[train_rows], y[train_rows], classes=classes)
+                    state['chunks_done'] = index + 1
+                    state['offset'] = offset
+                    checkpoint()
+
+                state['epoch'] += 1
+                state['chunks_done'] = 0
+                state['offset'] = None
+                checkpoint(force=True)
+
+            state['timings']['fit_pass'] = state['timings'].get('fit_pass', 0.0) + time.perf_counter() - stage_start
+            state['stage'] = 'calibrate'
+            checkpoint(force=True)
+
+        # --- Platt calibration and evaluation on the reservoirs ---
+        stage_start = time.perf_counter()
+        classifier = state['classifier']
+        X_holdout, y_holdout = [], []
+        for label, reservoir in state['reservoirs'].items():
+            n_rows = min(reservoir['seen'], reservoir['rows'].shape[0])
+            X_holdout.append(reservoir['rows'][:n_rows])
+            y_holdout.append(np.full(n_rows, label))
+        X_holdout = np.concatenate(X_holdout)
+        y_holdout = np.concatenate(y_holdout)
+        X_cal, X_eval, y_cal, y_eval = train_test_split(X_holdout, y_holdout, test_size=0.5, stratify=y_holdout, random_state=random_state)
+
+        prob_a, prob_b = fit_platt(-classifier.decision_function(X_cal), y_cal == classifier.classes_[0])
+        classifier.probA_ = np.array([prob_a])
+        classifier.probB_ = np.array([prob_b])
+        scorer = LinearScorer.from_estimators(classifier, state['scaler'])
+
+        probabilities = scorer.proba_from_decision(classifier.decision_function(X_eval))[:, 1]
+        report = {
+            'dataset': dataset_path,
+            'engine': 'sgd-stream',
+            'rows': int(counts.sum()),
+            'class_counts': {str(label): int(count) for label, count in zip(classes.tolist(), counts)},
+            'holdout_rows': int(len(y_holdout)),
+            'test': {
+                'roc_auc': float(roc_auc_score(y_eval, probabilities)),
+                'brier': float(brier_score_loss(y_eval, probabilities, pos_label=classes[1])),
+                'accuracy': float(accuracy_score(y_eval, classifier.predict(X_eval))),
+            },
+            'timings': state['timings'],
+        }
+        state['timings']['calibrate'] = time.perf_counter() - stage_start
+
+        joblib.dump(classifier, model_save_path)
+        joblib.dump(state['scaler'], scaler_save_path)
+        if artifact_save_path:
+            disease = os.path.splitext(os.path.basename(artifact_save_path))[0]
+            save_artifact(artifact_save_path, scorer, disease=disease)
+
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        print(f"Successfully trained and saved model from {dataset_path} to {model_save_path}")
+        return report
+
+    except KeyboardInterrupt:
+        print(f"\nInterrupted; run again with the same arguments to resume from {checkpoint_path}." if checkpoint_path else "\nInterrupted.")
+        raise
+    except Exception as e:
+        print(f"An error occurred while processing {dataset_path}: {e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train a model from a CSV too large for memory.")
+    parser.add_argument('dataset', help="CSV with the disease's feature columns and target column.")
+    parser.add_argument('--disease', required=True, choices=sorted(DISEASES))
+    parser.add_argument('--model-dir', default=MODEL_DIR)
+    parser.add_argument('--chunksize', type=int, default=100_000, help="Rows per chunk (default: 100000).")
+    parser.add_argument('--epochs', type=int, default=1, help="Passes of SGD over the file (default: 1).")
+    parser.add_argument('--holdout-fraction', type=float, default=0.1, help="Share of each class held out per chunk.")
+    parser.add_argument('--max-holdout-rows', type=int, default=200_000, help="Cap on rows kept for calibration/evaluation.")
+    parser.add_argument('--alpha', type=float, default=1e-4, help="SGD regularization strength.")
+    parser.add_argument('--balanced', action='store_true', help="Weight classes inversely to their frequency.")
+    parser.add_argument('--checkpoint', help="Checkpoint file; an existing one is resumed from.")
+    parser.add_argument('--checkpoint-interval', type=float, default=30.0, help="Seconds between checkpoints (default: 30).")
+    args = parser.parse_args()
+
+    spec = DISEASES[args.disease]
+    model_path, scaler_path = model_paths(args.disease, args.model_dir)
+    result = train_streaming(
+        dataset_path=args.dataset,
+        model_save_path=model_path,
+        scaler_save_path=scaler_path,
+        artifact_save_path=artifact_path(args.disease, args.model_dir),
+        target_column=spec['target_column'],
+        id_column=spec['id_column'],
+        feature_columns=spec['feature_columns'],
+        chunksize=args.chunksize,
+        epochs=args.epochs,
+        holdout_fraction=args.holdout_fraction,
+        max_holdout_rows=args.max_holdout_rows,
+        alpha=args.alpha,
+        class_weight='balanced' if args.balanced else None,
+        checkpoint_path=args.checkpoint,
+        checkpoint_interval=args.checkpoint_interval,
+    )
+    if result:
+        print(f"Hold-out ROC AUC {result['test']['roc_auc']:.4f}, Brier {result['test']['brier']:.4f} on {result['holdout_rows']:,} rows")